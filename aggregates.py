@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Trigger-maintained summary counts for veiculos
+veiculos_summary holds one row per (dimension, value) with the number of
+vehicles having that value, kept current by triggers on insert/update/delete,
+so /api/statistics and /api/filters/options read a few rows instead of
+scanning the table. Rebuild with `python init_db.py --rebuild-aggregates`.
+"""
+
+from database import db
+from lookups import LOOKUP_COLUMNS
+
+SUMMARY_TABLE = 'veiculos_summary'
+DELTA_TABLE = 'temp.veiculos_summary_delta'
+
+# dimension -> SQL expression over a veiculos row ({row} is '', 'new.' or 'old.').
+# Counts are kept per string value, decoded from the lookup tables.
+DIMENSIONS = {
+    attribute: f'(SELECT value FROM {table} WHERE id = {{row}}"{fk}")'
+    for attribute, (table, fk, _) in LOOKUP_COLUMNS.items()
+}
+DIMENSIONS['month'] = "strftime('%Y-%m', {row}\"dataapreensão_dt\")"
+
+# Columns whose update can move a row between values of each dimension
+DIMENSION_COLUMNS = {attribute: fk for attribute, (_, fk, _) in LOOKUP_COLUMNS.items()}
+DIMENSION_COLUMNS['month'] = 'dataapreensão_dt'
+
+_summary_available = {}
+
+def _expression(dimension, row='', dimensions=DIMENSIONS):
+    return dimensions[dimension].format(row=row)
+
+def _increment(dimension, row, dimensions=DIMENSIONS):
+    """Trigger body statements adding one to the count of a row's value"""
+    value = _expression(dimension, row, dimensions)
+    return (
+        f"INSERT INTO {SUMMARY_TABLE} (dimension, value, total) "
+        f"SELECT '{dimension}', {value}, 0 WHERE NOT EXISTS ("
+        f"SELECT 1 FROM {SUMMARY_TABLE} WHERE dimension = '{dimension}' AND value IS {value});\n"
+        f"UPDATE {SUMMARY_TABLE} SET total = total + 1 "
+        f"WHERE dimension = '{dimension}' AND value IS {value};"
+    )
+
+def _decrement(dimension, row, dimensions=DIMENSIONS):
+    """Trigger body statements removing one from the count of a row's value"""
+    value = _expression(dimension, row, dimensions)
+    return (
+        f"UPDATE {SUMMARY_TABLE} SET total = total - 1 "
+        f"WHERE dimension = '{dimension}' AND value IS {value};\n"
+        f"DELETE FROM {SUMMARY_TABLE} "
+        f"WHERE dimension = '{dimension}' AND value IS {value} AND total <= 0;"
+    )
+
+def create_statements(dimensions=DIMENSIONS, dimension_columns=DIMENSION_COLUMNS):
+    """
+    DDL for the summary table and its sync triggers (idempotent).
+    Migrations pass the dimension definitions of their own schema version.
+    """
+    statements = [
+        f"""CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+            dimension TEXT NOT NULL,
+            value TEXT,
+            total INTEGER NOT NULL
+        )""",
+        f"CREATE INDEX IF NOT EXISTS idx_{SUMMARY_TABLE}_dimension_value ON {SUMMARY_TABLE} (dimension, value)",
+        f"""CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE}_ai AFTER INSERT ON veiculos BEGIN
+            {' '.join(_increment(dimension, 'new.', dimensions) for dimension in dimensions)}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE}_ad AFTER DELETE ON veiculos BEGIN
+            {' '.join(_decrement(dimension, 'old.', dimensions) for dimension in dimensions)}
+        END""",
+    ]
+    for dimension, column in dimension_columns.items():
+        statements.append(
+            f"""CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE}_au_{dimension} AFTER UPDATE OF "{column}" ON veiculos
+            WHEN {_expression(dimension, 'old.', dimensions)} IS NOT {_expression(dimension, 'new.', dimensions)} BEGIN
+                {_decrement(dimension, 'old.', dimensions)}
+                {_increment(dimension, 'new.', dimensions)}
+            END"""
+        )
+    return statements
+
+TRIGGER_NAMES = ([f'{SUMMARY_TABLE}_ai', f'{SUMMARY_TABLE}_ad']
+                 + [f'{SUMMARY_TABLE}_au_{dimension}' for dimension in DIMENSIONS])
+
+def _grouped_counts(where='', sign='', dimensions=DIMENSIONS):
+    """SELECT of (dimension, value, count) for every dimension, one GROUP BY each"""
+    return ' UNION ALL '.join(
+        f"SELECT '{dimension}', {_expression(dimension, '', dimensions)}, {sign}COUNT(*) "
+        f"FROM veiculos {where} GROUP BY 2"
+        for dimension in dimensions
+    )
+
+def bulk_statements(id_query):
+    """
+    SQL to maintain the counts set-wise for the veiculos rows whose ids are
+    returned by id_query, for bulk writers that suspend the per-row triggers.
+    Returns (remove, add) statement lists: run remove before changing the rows,
+    add after. The changes are collected in a temp table and applied by add.
+    """
+    where = f"WHERE id IN ({id_query})"
+    remove = [
+        f"CREATE TABLE IF NOT EXISTS {DELTA_TABLE} (dimension TEXT, value TEXT, total INTEGER)",
+        f"INSERT INTO {DELTA_TABLE} {_grouped_counts(where, '-')}",
+    ]
+    add = [
+        f"CREATE TABLE IF NOT EXISTS {DELTA_TABLE} (dimension TEXT, value TEXT, total INTEGER)",
+        f"INSERT INTO {DELTA_TABLE} {_grouped_counts(where)}",
+        f"""INSERT INTO {SUMMARY_TABLE} (dimension, value, total)
+            SELECT DISTINCT d.dimension, d.value, 0 FROM {DELTA_TABLE} d
+            WHERE NOT EXISTS (SELECT 1 FROM {SUMMARY_TABLE} s
+                              WHERE s.dimension = d.dimension AND s.value IS d.value)""",
+        f"""UPDATE {SUMMARY_TABLE} SET total = total + (
+                SELECT SUM(d.total) FROM {DELTA_TABLE} d
+                WHERE d.dimension = {SUMMARY_TABLE}.dimension AND d.value IS {SUMMARY_TABLE}.value)
+            WHERE EXISTS (SELECT 1 FROM {DELTA_TABLE} d
+                          WHERE d.dimension = {SUMMARY_TABLE}.dimension AND d.value IS {SUMMARY_TABLE}.value)""",
+        f"DELETE FROM {SUMMARY_TABLE} WHERE total <= 0",
+        f"DELETE FROM {DELTA_TABLE}",
+    ]
+    return remove, add
+
+def create_summary_tables(connection, dimensions=DIMENSIONS, dimension_columns=DIMENSION_COLUMNS):
+    """Create the summary table and triggers, then count the existing rows"""
+    for statement in create_statements(dimensions, dimension_columns):
+        connection.exec_driver_sql(statement)
+    rebuild_summary_tables(connection, dimensions)
+
+def rebuild_summary_tables(connection, dimensions=DIMENSIONS):
+    """Recount every dimension from veiculos"""
+    connection.exec_driver_sql(f"DELETE FROM {SUMMARY_TABLE}")
+    connection.exec_driver_sql(
+        f"INSERT INTO {SUMMARY_TABLE} (dimension, value, total) {_grouped_counts(dimensions=dimensions)}"
+    )
+
+def summary_available(engine):
+    """Check once per engine whether the summary table has been created"""
+    key = str(engine.url)
+    if key not in _summary_available:
+        with engine.connect() as connection:
+            found = connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (SUMMARY_TABLE,)
+            ).scalar()
+        _summary_available[key] = bool(found)
+    return _summary_available[key]
+
+def summary_counts(dimension):
+    """(value, total) rows of one dimension, ordered by value"""
+    summary = db.table(SUMMARY_TABLE, db.column('dimension'), db.column('value'), db.column('total'))
+    return (
+        db.select(summary.c.value, summary.c.total)
+        .where(summary.c.dimension == dimension)
+        .order_by(summary.c.value)
+    )
+
+if __name__ == "__main__":
+    for statement in create_statements():
+        print(statement.strip() + ';\n')
@@ -4,64 +4,38 @@ Fixed Flask Application for SQLAlchemy 2.0+ compatibility
 Updated with proper "Outros" filter logic and date filtering
 """
 
-from flask import Flask, render_template, jsonify, request
-from datetime import datetime, timedelta
+from flask import Flask, Response, current_app, render_template, jsonify, request, stream_with_context
+from datetime import datetime
+import math
 import os
-import re
+import sys
+
+from sqlalchemy.sql.util import ClauseAdapter
 
 # Import database instance
-from database import db, init_db
+from database import db, init_db, data_version, execute_read, execute_reads, DEFAULT_SQLITE_PRAGMAS
+from dates import parse_date_field
+from fts import fts_available, build_match_query, match_ids, match_subquery
+from aggregates import summary_available, summary_counts
+from categories import OUTROS, category_options, category_of, category_values
+import lookups
+from pagination import keyset_paginate, InvalidCursor
+from cache import VersionedCache, cached_response
+from export import EXPORT_FORMATS, ExportUnavailable, check_format, export_vehicles
+from metrics import init_metrics, render_metrics, timed
+from compression import init_compression
+from assets import init_assets
+from slow_queries import init_slow_query_log
+from migrations import ensure_schema
 
-def parse_date_field(date_value):
-    """
-    Parse various date formats from database to comparable datetime
-    Returns None if unparseable
-    """
-    if not date_value:
-        return None
-        
-    date_str = str(date_value).strip()
-    
-    # Year only (e.g., "2023")
-    if re.match(r'^\d{4}$', date_str):
-        try:
-            return datetime(int(date_str), 1, 1)
-        except:
-            return None
-    
-    # Numeric timestamp
-    if re.match(r'^\d+(?:\.\d+)?$', date_str):
-        try:
-            num = int(float(date_str))
-            # Determine if it's seconds or milliseconds based on length
-            if len(str(num)) <= 10:
-                return datetime.fromtimestamp(num)
-            else:
-                return datetime.fromtimestamp(num / 1000)
-        except:
-            return None
-    
-    # Try to parse as standard date formats
-    date_formats = [
-        '%Y-%m-%d',           # 2023-12-25
-        '%d/%m/%Y',           # 25/12/2023
-        '%d-%m-%Y',           # 25-12-2023
-        '%Y/%m/%d',           # 2023/12/25
-        '%Y-%m-%d %H:%M:%S',  # 2023-12-25 10:30:00
-        '%d/%m/%Y %H:%M:%S',  # 25/12/2023 10:30:00
-    ]
-    
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except:
-            continue
-    
-    # If all else fails, try generic parsing
-    try:
-        return datetime.fromisoformat(date_str.replace('/', '-'))
-    except:
+def refuse_stale_schema():
+    """Answer every request with 503 while the database schema is behind the code"""
+    if current_app.config['SCHEMA_CURRENT']:
         return None
+    return jsonify({
+        'error': 'Database schema is out of date',
+        'message': 'Run python init_db.py --migrate and restart the server'
+    }), 503
 
 def create_app():
     """Application factory pattern"""
@@ -72,8 +46,59 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///veiculosapreendidos.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # count=estimate stops counting after this many rows
+    app.config['COUNT_ESTIMATE_CAP'] = 1000
+    
+    # Cache-Control max-age for cached_response endpoints (0 = always revalidate)
+    app.config['API_CACHE_MAX_AGE'] = 0
+    
+    # Rows fetched per round trip by /api/vehicles/export
+    app.config['EXPORT_BATCH_SIZE'] = 1000
+
+    # Serve the static/dist bundles built by `python assets.py` when they are up to date
+    app.config['ASSETS_BUNDLED'] = os.environ.get('ASSETS_BUNDLED', '1') == '1'
+
+    # gzip/brotli for JSON responses of at least COMPRESS_MIN_SIZE bytes (see compression.py)
+    app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', 6))
+
+    # SQLite file, read-only pool size and connection PRAGMAs (see database.py)
+    app.config['DATABASE_PATH'] = os.environ.get('VEICULOS_DB_PATH', 'veiculosapreendidos.db')
+    app.config['SQLITE_READ_POOL_SIZE'] = int(os.environ.get('SQLITE_READ_POOL_SIZE', 8))
+    app.config['SQLITE_PRAGMAS'] = dict(DEFAULT_SQLITE_PRAGMAS)
+
+    # Connection check and row counts at startup (off by default: they slow every worker spawn)
+    app.config['STARTUP_DIAGNOSTICS'] = os.environ.get('STARTUP_DIAGNOSTICS', '') == '1'
+
+    # SQL/serialization timing, Server-Timing header and /metrics
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+    # Log SELECTs slower than this many ms with their query plan (unset = off)
+    slow_query_ms = os.environ.get('SLOW_QUERY_MS')
+    app.config['SLOW_QUERY_MS'] = float(slow_query_ms) if slow_query_ms else None
+    app.config['SLOW_QUERY_LOG'] = os.environ.get('SLOW_QUERY_LOG', 'slow_queries.jsonl')
+
+    # Production server (python run.py --production)
+    app.config['SERVER_BIND'] = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+    app.config['SERVER_WORKERS'] = int(os.environ.get('SERVER_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+    app.config['SERVER_THREADS'] = int(os.environ.get('SERVER_THREADS', 4))
+    app.config['SERVER_TIMEOUT'] = int(os.environ.get('SERVER_TIMEOUT', 60))
+    app.config['SERVER_GRACEFUL_TIMEOUT'] = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+    app.config['SERVER_KEEPALIVE'] = int(os.environ.get('SERVER_KEEPALIVE', 5))
+
+    # Pending migrations are applied at startup; with AUTO_MIGRATE=0 a stale schema is refused instead
+    app.config['AUTO_MIGRATE'] = os.environ.get('AUTO_MIGRATE', '1') == '1'
+
     # Initialize database
     init_db(app)
+    app.config['SCHEMA_CURRENT'] = ensure_schema(app, migrate=app.config['AUTO_MIGRATE'])
+    if not app.config['SCHEMA_CURRENT']:
+        app.before_request(refuse_stale_schema)
+    init_metrics(app)
+    init_slow_query_log(app)
+    init_compression(app)
+    init_assets(app)
     
     return app
 
@@ -81,7 +106,190 @@ def create_app():
 app = create_app()
 
 # Import models after app is created
-from models import Veiculo
+from models import Veiculo, API_FIELDS, parse_fields, row_serializer
+from autocomplete import autocomplete_index
+
+# Filtered totals keyed on filter_signature(), dropped on the next database write
+count_cache = VersionedCache(max_entries=2048)
+
+# Options offered by the filter panel; "Outros" collects every other value
+PATIO_OPTIONS = category_options('patio')
+CIRCUNSCRICAO_OPTIONS = category_options('circunscricao')
+TIPO_OPTIONS = category_options('tipo')  # Clean UI - CAMINHONETE goes to "Outros"
+
+def patio_condition(patio):
+    """Filter condition for one patio option"""
+    if patio in PATIO_OPTIONS:
+        # Named options and "Outros" are indexed lookups on the encoded column
+        return lookups.matching('patio', lambda value: category_of('patio', value) == patio)
+    # Any other value keeps the (case-insensitive) substring match
+    return lookups.matching('patio', lambda value: patio.casefold() in value.casefold())
+
+def circunscricao_condition(circunscricao):
+    """Filter condition for one circunscricao option"""
+    if circunscricao == OUTROS:
+        return lookups.matching('circunscricao',
+                                lambda value: category_of('circunscricao', value) == OUTROS)
+    # Standard exact match
+    return lookups.equals('circunscricao', circunscricao)
+
+def tipo_condition(tipos):
+    """Filter condition for a set of tipo options, combined with OR"""
+    # UI values ("Moto", "Carro", "Outros") are categories; anything else is
+    # matched against the raw database value as before
+    return lookups.matching('tipo', lambda value: category_of('tipo', value) in tipos or value in tipos)
+
+def facet_conditions(args):
+    """Conditions of the active status/patio/circunscricao/tipo filters, keyed by facet"""
+    status = args.get('status', '', type=str)
+    patio = args.get('patio', '', type=str)
+    circunscricao = args.get('circunscricao', '', type=str)
+    tipos = args.getlist('tipo')
+    
+    conditions = {}
+    if status:
+        conditions['status'] = lookups.equals('status', status)
+    if patio:
+        conditions['patio'] = patio_condition(patio)
+    if circunscricao:
+        conditions['circunscricao'] = circunscricao_condition(circunscricao)
+    if tipos:
+        conditions['tipo'] = tipo_condition(tipos)
+    return conditions
+
+def apply_vehicle_filters(query, args, facets=True):
+    """
+    Apply the /api/vehicles filter parameters (search, status, patio,
+    circunscricao, tipo, date_from, date_to) to a Veiculo query.
+    facets=False leaves out the status/patio/circunscricao/tipo filters.
+    Returns the filtered query and the FTS rank column (None without FTS search).
+    """
+    search = args.get('search', '', type=str)
+    date_from = args.get('date_from', '', type=str)
+    date_to = args.get('date_to', '', type=str)
+    
+    # Substring search; the FTS5 trigram index narrows it down to candidate rows
+    # when it is available, and the ILIKE keeps the exact matching rules
+    search_rank = None
+    if search:
+        match_query = build_match_query(search) if fts_available(db.engine) else None
+        
+        if match_query and args.get('sort_by', '', type=str) == 'relevance':
+            matches = match_subquery(match_query)
+            query = query.join(matches, Veiculo.id == matches.c.id)
+            search_rank = matches.c.rank
+        elif match_query:
+            # Scoring every match with bm25 only pays off when sorting by it
+            query = query.filter(Veiculo.id.in_(match_ids(match_query)))
+        
+        search_filter = f"%{search}%"
+        query = query.filter(
+            db.or_(
+                Veiculo.placa_original.ilike(search_filter),
+                Veiculo.placa_ostentada.ilike(search_filter),
+                Veiculo.modelo.ilike(search_filter),
+                Veiculo.spj.ilike(search_filter),
+                Veiculo.chassi.ilike(search_filter),
+                Veiculo.proprietario.ilike(search_filter)
+            )
+        )
+    
+    # Apply filters with "Outros" logic
+    if facets:
+        for condition in facet_conditions(args).values():
+            query = query.filter(condition)
+    
+    # Apply date filtering on the normalized, indexed column
+    if date_from:
+        try:
+            filter_date_from = datetime.strptime(date_from, '%Y-%m-%d')
+            query = query.filter(Veiculo.data_apreensao_dt >= filter_date_from)
+        except ValueError:
+            print(f"Warning: Could not parse date_from: {date_from}")
+    
+    if date_to:
+        try:
+            filter_date_to = datetime.strptime(date_to, '%Y-%m-%d')
+            # Include the entire day
+            filter_date_to = filter_date_to.replace(hour=23, minute=59, second=59)
+            query = query.filter(Veiculo.data_apreensao_dt <= filter_date_to)
+        except ValueError:
+            print(f"Warning: Could not parse date_to: {date_to}")
+    
+    return query, search_rank
+
+def filter_signature(args):
+    """Normalized, hashable form of the filter parameters (page and sort excluded)"""
+    return (
+        args.get('search', '', type=str),
+        args.get('status', '', type=str),
+        args.get('patio', '', type=str),
+        args.get('circunscricao', '', type=str),
+        tuple(sorted(set(args.getlist('tipo')))),
+        args.get('date_from', '', type=str),
+        args.get('date_to', '', type=str),
+    )
+
+def count_statement(query):
+    """SELECT count(*) over the rows of a filtered query"""
+    return db.select(db.func.count()).select_from(
+        query.order_by(None).with_entities(Veiculo.id).subquery()
+    )
+
+def count_vehicles(query, args, mode='exact', counted=None):
+    """
+    Total rows of a filtered query as (total, exact), cached per filter signature.
+    mode='estimate' never counts past COUNT_ESTIMATE_CAP rows and may return
+    the cap as a lower bound; mode='none' skips counting entirely.
+    counted is an exact (total, data_version() read before counting) the caller
+    already computed, e.g. alongside the page.
+    """
+    if mode == 'none':
+        return None, False
+    
+    signature = filter_signature(args)
+    if counted is not None:
+        total, version = counted
+        count_cache.set(signature, total, version)
+        return total, True
+    
+    cached = count_cache.get(signature)
+    if cached is not None:
+        return cached, True
+    
+    version = data_version()
+    count_query = query.order_by(None).with_entities(Veiculo.id)
+    
+    if mode == 'estimate':
+        cap = app.config['COUNT_ESTIMATE_CAP']
+        capped = db.session.execute(
+            db.select(db.func.count())
+            .select_from(count_query.limit(cap).subquery())
+        ).scalar()
+        if capped >= cap:
+            return cap, False
+        count_cache.set(signature, capped, version)
+        return capped, True
+    
+    total = execute_read(count_statement(query)).scalar()
+    count_cache.set(signature, total, version)
+    return total, True
+
+def resolve_sort(query, sort_by, sort_order, search_rank=None):
+    """
+    Map the sort_by/sort_order parameters to (query, sort expression, descending),
+    joining what the sort expression needs. Unknown fields fall back to id descending.
+    """
+    safe_sort_fields = ['id', 'spj', 'status', 'modelo', 'placa_original', 'ano']
+    if sort_by == 'relevance' and search_rank is not None:
+        # Best FTS matches first (bm25 rank is lower for better matches)
+        return query, search_rank, False
+    if sort_by in safe_sort_fields and sort_by in lookups.LOOKUP_COLUMNS:
+        query, sort_column = lookups.sort_by(query, sort_by)
+        return query, sort_column, sort_order == 'desc'
+    if sort_by in safe_sort_fields and hasattr(Veiculo, sort_by):
+        return query, getattr(Veiculo, sort_by), sort_order == 'desc'
+    return query, Veiculo.id, True
 
 @app.route('/')
 def index():
@@ -90,191 +298,109 @@ def index():
 
 @app.route('/api/vehicles')
 def get_vehicles():
-    """API endpoint to get vehicles with filtering and pagination"""
+    """
+    API endpoint to get vehicles with filtering and pagination.
+    Page-number pagination by default; pass cursor= (empty for the first
+    page) to switch to keyset pagination with next_cursor/prev_cursor.
+    prefetch=1 adds the full records of the page under 'details', keyed by id,
+    so the details view can open without another request.
+    """
     
     # Get query parameters
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 5, type=int)
-    search = request.args.get('search', '', type=str)
-    status = request.args.get('status', '', type=str)
-    patio = request.args.get('patio', '', type=str)
-    circunscricao = request.args.get('circunscricao', '', type=str)
-    tipos = request.args.getlist('tipo')
-    date_from = request.args.get('date_from', '', type=str)
-    date_to = request.args.get('date_to', '', type=str)
     sort_by = request.args.get('sort_by', 'id', type=str)
     sort_order = request.args.get('sort_order', 'desc', type=str)
+    cursor = request.args.get('cursor', None, type=str)
+    count_mode = request.args.get('count', 'exact', type=str)
+    fields = parse_fields(request.args.get('fields', '', type=str))
+    prefetch = request.args.get('prefetch', '', type=str).lower() in ('1', 'true', 'yes')
     
     try:
-        # Build query
-        query = Veiculo.query
-        
-        # Apply search filter
-        if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Veiculo.placa_original.ilike(search_filter),
-                    Veiculo.placa_ostentada.ilike(search_filter),
-                    Veiculo.modelo.ilike(search_filter),
-                    Veiculo.spj.ilike(search_filter),
-                    Veiculo.chassi.ilike(search_filter),
-                    Veiculo.proprietario.ilike(search_filter)
+        # Build query; rows are read as plain column tuples (no ORM objects)
+        # holding only the columns the requested fields need
+        columns, serialize = row_serializer(fields)
+        query, search_rank = apply_vehicle_filters(Veiculo.query, request.args)
+        # The count reads the filtered query, without the joins sorting may add
+        sorted_query, sort_column, descending = resolve_sort(query, sort_by, sort_order, search_rank)
+        
+        if cursor is not None:
+            try:
+                rows, cursor_info = keyset_paginate(
+                    sorted_query.with_entities(*columns), sort_column, descending, cursor, per_page,
+                    sort_signature=f"{sort_by}:{sort_order}"
                 )
-            )
-        
-        # Apply filters with "Outros" logic
-        if status:
-            query = query.filter(Veiculo.status == status)
-        
-        if patio:
-            # Define predefined patio options (excluding "Outros")
-            predefined_patios = ["16º DP", "17º DP", "35º DP", "JDN - Atibaia", "-"]
+            except InvalidCursor:
+                return jsonify({'error': 'Invalid cursor'}), 400
             
-            if patio == "Outros":
-                # Filter for records that don't match any predefined option
-                query = query.filter(
-                    db.and_(
-                        Veiculo.patio.isnot(None),
-                        ~Veiculo.patio.in_(predefined_patios)
-                    )
-                )
-            else:
-                # Standard exact match
-                query = query.filter(Veiculo.patio.ilike(f"%{patio}%"))
-        
-        if circunscricao:
-            # Define predefined circunscricao options (excluding "Outros")
-            predefined_circunscricoes = ["16º DP", "17º DP", "35º DP"]
-            
-            if circunscricao == "Outros":
-                # Filter for records that don't match any predefined option
-                query = query.filter(
-                    db.and_(
-                        Veiculo.circunscricao.isnot(None),
-                        ~Veiculo.circunscricao.in_(predefined_circunscricoes)
-                    )
-                )
-            else:
-                # Standard exact match
-                query = query.filter(Veiculo.circunscricao == circunscricao)
-        
-        # NOVA LÓGICA OR PARA TIPOS COM SUPORTE A "Outros" + UI MAPPING
-        # UI shows user-friendly "Moto"/"Carro", but maps to database values "MOTO"/"CARRO"
-        # CAMINHONETE and other types go to "Outros" category
-        if tipos:
-            # Map UI values to database values
-            tipo_mapping = {
-                "Moto": "MOTO",
-                "Carro": "CARRO"
+            with timed('serialize'):
+                vehicles = [serialize(row) for row in rows]
+            response = {
+                'vehicles': vehicles,
+                'pagination': dict(per_page=per_page, **cursor_info)
             }
-            
-            # Define predefined tipo options (excluding "Outros") - only main types
-            predefined_tipos = ["MOTO", "CARRO"]  # CAMINHONETE goes to "Outros"
-            
-            # Check if "Outros" is selected along with other types
-            if "Outros" in tipos:
-                outros_filter = db.and_(
-                    Veiculo.tipo.isnot(None),
-                    ~Veiculo.tipo.in_(predefined_tipos)
-                )
-                
-                # Remove "Outros" from tipos list to process other selections
-                outros_tipos = [t for t in tipos if t != "Outros"]
-                
-                if outros_tipos:
-                    # Map UI values to database values and combine with "Outros" logic
-                    mapped_tipos = [tipo_mapping.get(t, t) for t in outros_tipos]
-                    tipo_filters = [Veiculo.tipo == tipo for tipo in mapped_tipos]
-                    tipo_filters.append(outros_filter)
-                    query = query.filter(db.or_(*tipo_filters))
-                else:
-                    # Only "Outros" is selected
-                    query = query.filter(outros_filter)
-            else:
-                # No "Outros" selected, map UI values to database values
-                mapped_tipos = [tipo_mapping.get(t, t) for t in tipos]
-                tipo_filters = [Veiculo.tipo == tipo for tipo in mapped_tipos]
-                query = query.filter(db.or_(*tipo_filters))
-        
-        # Apply date filtering - NEW LOGIC
-        if date_from or date_to:
-            # Get all vehicles first, then filter by date in Python due to string date formats
-            vehicles_for_date_filter = query.all()
-            filtered_vehicle_ids = []
-            
-            # Parse filter dates
-            filter_date_from = None
-            filter_date_to = None
-            
-            if date_from:
-                try:
-                    filter_date_from = datetime.strptime(date_from, '%Y-%m-%d')
-                except:
-                    print(f"Warning: Could not parse date_from: {date_from}")
-            
-            if date_to:
-                try:
-                    filter_date_to = datetime.strptime(date_to, '%Y-%m-%d')
-                    # Include the entire day
-                    filter_date_to = filter_date_to.replace(hour=23, minute=59, second=59)
-                except:
-                    print(f"Warning: Could not parse date_to: {date_to}")
-            
-            # Filter vehicles by date
-            for vehicle in vehicles_for_date_filter:
-                vehicle_date = parse_date_field(vehicle.data_apreensao)
-                
-                if vehicle_date:
-                    include_vehicle = True
-                    
-                    if filter_date_from and vehicle_date < filter_date_from:
-                        include_vehicle = False
-                    
-                    if filter_date_to and vehicle_date > filter_date_to:
-                        include_vehicle = False
-                    
-                    if include_vehicle:
-                        filtered_vehicle_ids.append(vehicle.id)
-            
-            # Apply the date filter to the query
-            if filtered_vehicle_ids:
-                query = query.filter(Veiculo.id.in_(filtered_vehicle_ids))
-            else:
-                # No vehicles match the date filter
-                query = query.filter(Veiculo.id.in_([-1]))  # Empty result
+            if prefetch:
+                response['details'] = vehicle_details([vehicle['id'] for vehicle in vehicles])
+            return jsonify(response)
         
         # Apply sorting
-        safe_sort_fields = ['id', 'spj', 'status', 'modelo', 'placa_original', 'ano']
-        if sort_by in safe_sort_fields and hasattr(Veiculo, sort_by):
-            if sort_order == 'desc':
-                query = query.order_by(getattr(Veiculo, sort_by).desc())
-            else:
-                query = query.order_by(getattr(Veiculo, sort_by).asc())
+        if sort_by == 'relevance' and search_rank is not None:
+            sorted_query = sorted_query.order_by(search_rank, Veiculo.id.desc())
+        elif descending:
+            sorted_query = sorted_query.order_by(sort_column.desc())
         else:
-            query = query.order_by(Veiculo.id.desc())
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+            sorted_query = sorted_query.order_by(sort_column.asc())
+        
+        # Paginate results; one extra row tells whether a next page exists
+        current_page = page if page > 0 else 1
+        page_size = per_page if per_page > 0 else 20
+        offset = (current_page - 1) * page_size
+        
+        page_query = sorted_query.with_entities(*columns).limit(page_size + 1).offset(offset)
+        counted = None
+        if count_mode == 'exact' and count_cache.get(filter_signature(request.args)) is None:
+            # The page and its total are read from the same snapshot
+            version = data_version()
+            rows, count_rows = execute_reads([page_query.statement, count_statement(query)])
+            counted = (count_rows[0][0], version)
+        else:
+            rows = execute_read(page_query.statement).all()
+        vehicles = rows[:page_size]
+        has_more = len(rows) > page_size
+        
+        # Totals come from the count cache; count=estimate|none avoids a full COUNT(*)
+        if count_mode == 'estimate' and not has_more and (vehicles or offset == 0):
+            # This page reached the end of the results, so the total is known
+            total, total_exact = offset + len(vehicles), True
+        else:
+            total, total_exact = count_vehicles(query, request.args, count_mode, counted)
         
-        vehicles = pagination.items
+        if total is None:
+            pages = None
+            has_next = has_more
+        else:
+            if not total_exact and vehicles:
+                total = max(total, offset + len(vehicles) + int(has_more))
+            pages = math.ceil(total / page_size) if total else 0
+            has_next = current_page < pages if total_exact else has_more
         
         # Format response
+        with timed('serialize'):
+            vehicles = [serialize(row) for row in vehicles]
         response = {
-            'vehicles': [vehicle.to_dict() for vehicle in vehicles],
+            'vehicles': vehicles,
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
+                'total': total,
+                'total_exact': total_exact,
+                'pages': pages,
+                'has_next': has_next,
+                'has_prev': current_page > 1
             }
         }
+        if prefetch:
+            response['details'] = vehicle_details([vehicle['id'] for vehicle in vehicles])
         
         return jsonify(response)
         
@@ -295,19 +421,186 @@ def get_vehicles():
             }
         }), 500
         
+@app.route('/api/vehicles/count')
+def get_vehicle_count():
+    """Exact total for the /api/vehicles filter parameters (cached until the next write)"""
+    
+    try:
+        query, _ = apply_vehicle_filters(Veiculo.query, request.args)
+        total, _ = count_vehicles(query, request.args, 'exact')
+        return jsonify({'total': total, 'total_exact': True})
+    except Exception as e:
+        print(f"Error in get_vehicle_count: {e}")
+        return jsonify({'error': 'Failed to count vehicles'}), 500
+
+@app.route('/api/vehicles/facets')
+@cached_response
+def get_vehicle_facets():
+    """
+    Per-option counts for the status, patio, circunscricao and tipo filters
+    (with their "Outros" buckets). Each facet is counted with the other active
+    filters applied, so a count is what /api/vehicles would return if that
+    option were selected. All counts come from a single query.
+    """
+    
+    try:
+        query, _ = apply_vehicle_filters(Veiculo.query, request.args, facets=False)
+        active = facet_conditions(request.args)
+        
+        facets = {
+            'status': (status_option_values(), lambda value: lookups.equals('status', value)),
+            'patio': (PATIO_OPTIONS, patio_condition),
+            'circunscricao': (CIRCUNSCRICAO_OPTIONS, circunscricao_condition),
+            'tipo': (TIPO_OPTIONS, lambda value: tipo_condition([value])),
+        }
+        
+        # The single pass over veiculos groups by the four integer facet columns; the
+        # per-option counts are then summed over those few groups, with the
+        # filter conditions rewritten to point at the grouped columns
+        group_columns = [Veiculo.status_id, Veiculo.patio_id, Veiculo.circunscricao_id, Veiculo.tipo_id]
+        grouped = (
+            query.order_by(None)
+            .with_entities(*group_columns, db.func.count().label('vehicles'))
+            .group_by(*group_columns)
+            .subquery('facet_groups')
+        )
+        adapter = ClauseAdapter(grouped)
+        
+        def count_where(conditions):
+            total = db.func.sum(grouped.c.vehicles)
+            if conditions:
+                total = total.filter(adapter.traverse(db.and_(*conditions)))
+            return db.func.coalesce(total, 0)
+        
+        # One SUM(...) FILTER (WHERE ...) column per option, plus the overall total
+        columns = [count_where(list(active.values()))]
+        for facet, (values, condition) in facets.items():
+            others = [c for name, c in active.items() if name != facet]
+            columns.extend(count_where(others + [condition(value)]) for value in values)
+        
+        counts = iter(execute_read(db.select(*columns).select_from(grouped)).one())
+        
+        response = {'total': next(counts), 'facets': {}}
+        for facet, (values, _) in facets.items():
+            response['facets'][facet] = [{'value': value, 'count': next(counts)} for value in values]
+        
+        return jsonify(response)
+        
+    except Exception as e:
+        print(f"Error in get_vehicle_facets: {e}")
+        return jsonify({'error': 'Failed to count facets'}), 500
+
+@app.route('/api/vehicles/export')
+def export_vehicle_list():
+    """
+    Stream every vehicle matching the /api/vehicles filters as CSV, NDJSON or
+    Parquet (format=csv|ndjson|parquet). Memory use does not grow with the
+    result size; fields=, sort_by and sort_order work as in the list endpoint.
+    """
+    
+    export_format = request.args.get('format', 'csv', type=str)
+    sort_by = request.args.get('sort_by', 'id', type=str)
+    sort_order = request.args.get('sort_order', 'desc', type=str)
+    fields = parse_fields(request.args.get('fields', '', type=str))
+    
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unknown export format: {export_format}'}), 400
+    
+    try:
+        check_format(export_format)
+    except ExportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    
+    columns, serialize = row_serializer(fields)
+    query, search_rank = apply_vehicle_filters(Veiculo.query, request.args)
+    query, sort_column, descending = resolve_sort(query, sort_by, sort_order, search_rank)
+    query = query.with_entities(*columns).order_by(
+        sort_column.desc() if descending else sort_column.asc(), Veiculo.id.desc()
+    )
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    body = export_vehicles(
+        query.statement, export_format, fields or API_FIELDS, serialize,
+        batch_size=app.config['EXPORT_BATCH_SIZE']
+    )
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=veiculos.{extension}'}
+    )
+
+# Upper bound on the ids of one /api/vehicles/batch request
+MAX_BATCH_IDS = 500
+
+def parse_vehicle_ids(values):
+    """Unique vehicle ids, in request order, from comma-separated and/or repeated ids values"""
+    ids = []
+    for value in values:
+        ids.extend(int(part) for part in str(value).split(',') if part.strip())
+    return list(dict.fromkeys(ids))
+
+def vehicle_details(ids):
+    """{id: full record, as /api/vehicle/<id> returns it} for many ids in one primary-key query"""
+    if not ids:
+        return {}
+    columns, serialize = row_serializer()
+    rows = execute_read(db.select(*columns).where(Veiculo.id.in_(ids))).all()
+    with timed('serialize'):
+        return {row[0]: serialize(row) for row in rows}
+
 @app.route('/api/vehicle/<int:vehicle_id>')
 def get_vehicle_details(vehicle_id):
     """Get detailed information for a specific vehicle"""
     
     try:
-        vehicle = db.session.get(Veiculo, vehicle_id)
+        vehicle = db.session.get(
+            Veiculo, vehicle_id, options=[db.undefer_group('observacoes')]
+        )
         if not vehicle:
             return jsonify({'error': 'Vehicle not found'}), 404
-        return jsonify(vehicle.to_dict())
+        with timed('serialize'):
+            data = vehicle.to_dict()
+        return jsonify(data)
     except Exception as e:
         print(f"Error getting vehicle details: {e}")
         return jsonify({'error': 'Vehicle not found'}), 404
 
+@app.route('/api/vehicles/batch', methods=['GET', 'POST'])
+def get_vehicles_batch():
+    """
+    Full records of many vehicles in one query: GET ?ids=1,2,3, or POST a JSON
+    {"ids": [...]} body (or an ids form field) for long lists. Records come back
+    in the requested order; ids that don't exist are listed under 'missing'.
+    """
+    
+    if request.method == 'POST':
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            values = payload.get('ids') or []
+            values = values if isinstance(values, list) else [values]
+        else:
+            values = request.form.getlist('ids')
+    else:
+        values = request.args.getlist('ids')
+    
+    try:
+        ids = parse_vehicle_ids(values)
+    except ValueError:
+        return jsonify({'error': 'Invalid ids'}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({'error': f'At most {MAX_BATCH_IDS} ids per request'}), 400
+    
+    try:
+        details = vehicle_details(ids)
+        return jsonify({
+            'vehicles': [details[vehicle_id] for vehicle_id in ids if vehicle_id in details],
+            'missing': [vehicle_id for vehicle_id in ids if vehicle_id not in details]
+        })
+    except Exception as e:
+        print(f"Error getting vehicle batch: {e}")
+        return jsonify({'error': 'Failed to load vehicles'}), 500
+
 @app.route('/api/search/autocomplete')
 def autocomplete():
     """Autocomplete endpoint for search suggestions"""
@@ -318,80 +611,46 @@ def autocomplete():
         return jsonify([])
     
     try:
-        suggestions = []
-        search_filter = f"%{query}%"
-        
-        # Placas
-        placas = db.session.execute(
-            db.select(Veiculo.placa_original)
-            .where(Veiculo.placa_original.ilike(search_filter))
-            .distinct()
-            .limit(5)
-        ).scalars().all()
-        
-        for placa in placas:
-            if placa:
-                suggestions.append({
-                    'value': placa,
-                    'type': 'placa'
-                })
-        
-        # Modelos
-        modelos = db.session.execute(
-            db.select(Veiculo.modelo)
-            .where(Veiculo.modelo.ilike(search_filter))
-            .distinct()
-            .limit(5)
-        ).scalars().all()
-        
-        for modelo in modelos:
-            if modelo:
-                suggestions.append({
-                    'value': modelo,
-                    'type': 'modelo'
-                })
-        
-        # SPJs
-        spjs = db.session.execute(
-            db.select(Veiculo.spj)
-            .where(Veiculo.spj.ilike(search_filter))
-            .distinct()
-            .limit(5)
-        ).scalars().all()
-        
-        for spj in spjs:
-            if spj:
-                suggestions.append({
-                    'value': spj,
-                    'type': 'spj'
-                })
-        
-        return jsonify(suggestions[:10])
+        # Served from the in-memory index; it only queries the database
+        # again after another connection has committed changes
+        return jsonify(autocomplete_index.suggest(query))
         
     except Exception as e:
         print(f"Autocomplete error: {e}")
         return jsonify([])
 
-@app.route('/api/filters/options')
-def get_filter_options():
-    """Get available options for filters"""
-    try:
+def status_option_values():
+    """Status values present in the database (empty values left out)"""
+    if summary_available(db.engine):
+        status_options = [value for value, _ in db.session.execute(summary_counts('status'))]
+    else:
         # Get all unique status values from database
         status_options = db.session.execute(
             db.select(Veiculo.status).distinct()
         ).scalars().all()
-        
-        # Optional: Check if there are any "outros" tipos beyond our main types
-        predefined_tipos = ["MOTO", "CARRO"]  # Only main types, CAMINHONETE goes to "Outros"
-        outros_tipos_count = db.session.execute(
-            db.select(db.func.count(Veiculo.id))
-            .where(
-                db.and_(
-                    Veiculo.tipo.isnot(None),
-                    ~Veiculo.tipo.in_(predefined_tipos)
-                )
+    return [opt for opt in status_options if opt]
+
+@app.route('/api/filters/options')
+@cached_response
+def get_filter_options():
+    """Get available options for filters"""
+    failed = False
+    try:
+        status_options = status_option_values()
+        
+        if summary_available(db.engine):
+            # A few rows of the trigger-maintained summary instead of a table scan
+            predefined_tipos = category_values('tipo')
+            outros_tipos_count = sum(
+                total for value, total in db.session.execute(summary_counts('tipo'))
+                if value is not None and value not in predefined_tipos
             )
-        ).scalar()
+        else:
+            # Optional: Check if there are any "outros" tipos beyond our main types
+            outros_tipos_count = db.session.execute(
+                db.select(db.func.count(Veiculo.id))
+                .where(tipo_condition([OUTROS]))
+            ).scalar()
         
         if outros_tipos_count > 0:
             print(f"Info - Found {outros_tipos_count} vehicles with tipo values in 'Outros' category (including CAMINHONETE)")
@@ -399,36 +658,48 @@ def get_filter_options():
     except Exception as e:
         print(f"Filters options error: {e}")
         status_options = []
+        failed = True
     
     options = {
-        'status': [opt for opt in status_options if opt],
-        'patio': ["16º DP", "17º DP", "35º DP", "JDN - Atibaia", "-", "Outros"],
-        'circunscricao': ["16º DP", "17º DP", "35º DP", "Outros"],
-        'tipo': ["Moto", "Carro", "Outros"]  # Clean UI - CAMINHONETE goes to "Outros"
+        'status': status_options,
+        'patio': PATIO_OPTIONS,
+        'circunscricao': CIRCUNSCRICAO_OPTIONS,
+        'tipo': TIPO_OPTIONS
     }
-    return jsonify(options)
+    response = jsonify(options)
+    if failed:
+        # Don't let cached_response keep the fallback until the next write
+        response.cache_control.no_store = True
+    return response
 
 @app.route('/api/statistics')
+@cached_response
 def get_statistics():
     """Get dashboard statistics"""
     
     try:
-        # Total vehicles
-        total_vehicles = db.session.execute(
-            db.select(db.func.count(Veiculo.id))
-        ).scalar()
-        
-        # Count by status using SQLAlchemy 2.0+ syntax
-        status_counts = db.session.execute(
-            db.select(Veiculo.status, db.func.count(Veiculo.id))
-            .group_by(Veiculo.status)
-        ).all()
-        
-        # Count by type
-        type_counts = db.session.execute(
-            db.select(Veiculo.tipo, db.func.count(Veiculo.id))
-            .group_by(Veiculo.tipo)
-        ).all()
+        if summary_available(db.engine):
+            # Trigger-maintained counts: a few rows instead of three table scans
+            status_counts = db.session.execute(summary_counts('status')).all()
+            type_counts = db.session.execute(summary_counts('tipo')).all()
+            total_vehicles = sum(total for _, total in status_counts)
+        else:
+            # Total vehicles
+            total_vehicles = db.session.execute(
+                db.select(db.func.count(Veiculo.id))
+            ).scalar()
+            
+            # Count by status using SQLAlchemy 2.0+ syntax
+            status_counts = db.session.execute(
+                db.select(Veiculo.status, db.func.count(Veiculo.id))
+                .group_by(Veiculo.status)
+            ).all()
+            
+            # Count by type
+            type_counts = db.session.execute(
+                db.select(Veiculo.tipo, db.func.count(Veiculo.id))
+                .group_by(Veiculo.tipo)
+            ).all()
         
         response = {
             'total_vehicles': total_vehicles,
@@ -441,12 +712,19 @@ def get_statistics():
         
     except Exception as e:
         print(f"Statistics error: {e}")
-        return jsonify({
+        response = jsonify({
             'total_vehicles': 0,
             'status_distribution': {},
             'type_distribution': {},
             'recent_vehicles': 0
         })
+        response.cache_control.no_store = True
+        return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/test')
 def test_connection():
@@ -491,37 +769,19 @@ def test_connection():
                 })
         
         # Test "Outros" filters
-        predefined_patios = ["16º DP", "17º DP", "35º DP", "JDN - Atibaia", "-"]
         outros_patios_count = db.session.execute(
             db.select(db.func.count(Veiculo.id))
-            .where(
-                db.and_(
-                    Veiculo.patio.isnot(None),
-                    ~Veiculo.patio.in_(predefined_patios)
-                )
-            )
+            .where(patio_condition(OUTROS))
         ).scalar()
         
-        predefined_circunscricoes = ["16º DP", "17º DP", "35º DP"]
         outros_circunscricoes_count = db.session.execute(
             db.select(db.func.count(Veiculo.id))
-            .where(
-                db.and_(
-                    Veiculo.circunscricao.isnot(None),
-                    ~Veiculo.circunscricao.in_(predefined_circunscricoes)
-                )
-            )
+            .where(circunscricao_condition(OUTROS))
         ).scalar()
         
-        predefined_tipos = ["MOTO", "CARRO"]  # Only main types, CAMINHONETE goes to "Outros"
         outros_tipos_count = db.session.execute(
             db.select(db.func.count(Veiculo.id))
-            .where(
-                db.and_(
-                    Veiculo.tipo.isnot(None),
-                    ~Veiculo.tipo.in_(predefined_tipos)
-                )
-            )
+            .where(tipo_condition([OUTROS]))
         ).scalar()
         
         return jsonify({
@@ -554,8 +814,8 @@ def internal_error(error):
     db.session.rollback()
     return jsonify({'error': 'Erro interno do servidor'}), 500
 
-if __name__ == '__main__':
-    # Test database connection on startup
+def startup_diagnostics():
+    """Print the vehicle and "Outros" pátio counts (opt-in, see STARTUP_DIAGNOSTICS)"""
     with app.app_context():
         try:
             result = db.session.execute(db.text("SELECT COUNT(*) FROM veiculos"))
@@ -563,20 +823,21 @@ if __name__ == '__main__':
             print(f"🚀 Starting app with {count} vehicles in database")
             
             # Test "Outros" logic on startup
-            predefined_patios = ["16º DP", "17º DP", "35º DP", "JDN - Atibaia", "-"]
             outros_patios_count = db.session.execute(
                 db.select(db.func.count(Veiculo.id))
-                .where(
-                    db.and_(
-                        Veiculo.patio.isnot(None),
-                        ~Veiculo.patio.in_(predefined_patios)
-                    )
-                )
+                .where(patio_condition(OUTROS))
             ).scalar()
             print(f"🔍 Found {outros_patios_count} vehicles with 'outros' pátios")
             
         except Exception as e:
             print(f"⚠️  Database connection issue: {e}")
+
+if __name__ == '__main__':
+    if not app.config['SCHEMA_CURRENT']:
+        sys.exit(1)
+    
+    if app.config['STARTUP_DIAGNOSTICS']:
+        startup_diagnostics()
     
     # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
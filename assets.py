@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Offline build of the dashboard's static bundles
+Concatenates and minifies static/js and static/css into content-hashed files in
+static/dist (plus precompressed .gz/.br variants) and writes a manifest. The
+asset_urls() template helper points at the bundles when they are built and up
+to date, and at the individual source files otherwise. Bundles are served from
+/assets/ with a one-year immutable Cache-Control.
+
+    python assets.py
+"""
+
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / 'static'
+DIST_DIR = STATIC_DIR / 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# bundle -> source files relative to static/, in load order
+BUNDLES = {
+    'app.css': ['css/main.css'],
+    'app.js': [
+        'js/config.js', 'js/utils.js', 'js/api.js', 'js/ui.js', 'js/filters.js',
+        'js/search.js', 'js/table.js', 'js/details.js', 'js/columns.js', 'js/main.js',
+    ],
+}
+
+# Content-Encoding -> file suffix of the precompressed variants, in order of preference
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+ONE_YEAR = 365 * 24 * 3600
+
+CSS_IMPORT = re.compile(r'''@import\s+(?:url\()?\s*['"]?([^'")\s;]+)['"]?\s*\)?\s*;''')
+CSS_TOKEN = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/|(\s+)''', re.S)
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+# A '/' after one of these (or these keywords) starts a regular expression, not a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                  'void', 'throw', 'instanceof', 'yield', 'await'}
+TRAILING_WORD = re.compile(r'([A-Za-z_$][\w$]*)$')
+
+def inline_css_imports(path, seen=None):
+    """CSS of a file with its @import rules replaced by the imported files"""
+    seen = set() if seen is None else seen
+    path = path.resolve()
+    if path in seen:
+        return ''
+    seen.add(path)
+    text = path.read_text(encoding='utf-8')
+    return CSS_IMPORT.sub(lambda match: inline_css_imports(path.parent / match.group(1), seen), text)
+
+def minify_css(source):
+    """Drop comments and collapse whitespace, leaving strings untouched"""
+    strings = []
+
+    def token(match):
+        if match.group(1):
+            strings.append(match.group(1))
+            return f'\0{len(strings) - 1}\0'
+        return ' ' if match.group(2) else ''
+
+    text = CSS_TOKEN.sub(token, source)
+    text = CSS_PUNCTUATION.sub(r'\1', text).replace(';}', '}').strip()
+    return re.sub(r'\0(\d+)\0', lambda match: strings[int(match.group(1))], text)
+
+def _scan_quoted(source, start):
+    """Index just past the string literal starting at source[start]"""
+    quote, i = source[start], start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == quote:
+            return i + 1
+        elif source[i] == '\n':
+            break
+        else:
+            i += 1
+    raise ValueError(f"Unterminated string at offset {start}")
+
+def _scan_regex(source, start):
+    """Index just past the regular expression literal (and flags) starting at source[start]"""
+    i, in_class = start + 1, False
+    while i < len(source):
+        ch = source[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '\n':
+            break
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    raise ValueError(f"Unterminated regular expression at offset {start}")
+
+def _scan_template(source, start):
+    """Index past the template literal text from start up to its closing ` or ${, and which one ended it"""
+    i = start
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == '`':
+            return i + 1, '`'
+        elif source.startswith('${', i):
+            return i + 2, '${'
+        else:
+            i += 1
+    raise ValueError(f"Unterminated template literal at offset {start}")
+
+def minify_js(source):
+    """
+    Conservative JavaScript minifier: drops comments, indentation and blank
+    lines. Strings, template literals and regular expressions are copied as
+    they are, and line breaks are kept so automatic semicolon insertion still
+    sees the same statements.
+    """
+    out = []
+    code = []  # significant code emitted so far, for the regex/division decision
+    template_depths = []  # brace depth at which each open ${ ... } returns to its template
+    depth = 0
+    i, n = 0, len(source)
+
+    def emit(text, significant=True):
+        out.append(text)
+        if significant:
+            code.append(text)
+
+    def whitespace(newline):
+        if not out:
+            return
+        if out[-1] in (' ', '\n'):
+            if newline and out[-1] == ' ':
+                out[-1] = '\n'
+        else:
+            out.append('\n' if newline else ' ')
+
+    def open_template(i):
+        nonlocal depth
+        end, closer = _scan_template(source, i)
+        emit(source[i:end])
+        if closer == '${':
+            template_depths.append(depth)
+            depth += 1
+        return end
+
+    while i < n:
+        ch = source[i]
+        if ch in ' \t\r\n':
+            start = i
+            while i < n and source[i] in ' \t\r\n':
+                i += 1
+            whitespace('\n' in source[start:i])
+        elif ch in '\'"':
+            end = _scan_quoted(source, i)
+            emit(source[i:end])
+            i = end
+        elif ch == '`':
+            emit('`')
+            i = open_template(i + 1)
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end == -1:
+                raise ValueError(f"Unterminated comment at offset {i}")
+            whitespace('\n' in source[i:end])
+            i = end + 2
+        elif ch == '/':
+            previous = ''.join(code[-8:]).rstrip()
+            word = TRAILING_WORD.search(previous)
+            if not previous or previous[-1] in REGEX_PRECEDERS or (word and word.group(1) in REGEX_KEYWORDS):
+                end = _scan_regex(source, i)
+                emit(source[i:end])
+                i = end
+            else:
+                emit('/')
+                i += 1
+        elif ch == '{':
+            depth += 1
+            emit(ch)
+            i += 1
+        elif ch == '}':
+            depth -= 1
+            if template_depths and template_depths[-1] == depth:
+                template_depths.pop()
+                emit('}')
+                i = open_template(i + 1)
+            else:
+                emit(ch)
+                i += 1
+        else:
+            start = i
+            while i < n and source[i] not in ' \t\r\n\'"`/{}':
+                i += 1
+            emit(source[start:i])
+
+    while out and out[-1] in (' ', '\n'):
+        out.pop()
+    while out and out[0] in (' ', '\n'):
+        out.pop(0)
+    return ''.join(out) + '\n'
+
+def bundle_source(name, sources):
+    """Concatenated, minified contents of one bundle"""
+    if name.endswith('.css'):
+        return '\n'.join(minify_css(inline_css_imports(STATIC_DIR / source)) for source in sources) + '\n'
+    # Each file is terminated on its own line so one file can't run into the next
+    return ';\n'.join(minify_js((STATIC_DIR / source).read_text(encoding='utf-8')) for source in sources)
+
+def build(output_dir=DIST_DIR):
+    """Write the fingerprinted bundles, their .gz/.br variants and the manifest (replacing older builds)"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.iterdir():
+        if stale.is_file():
+            stale.unlink()
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        content = bundle_source(name, sources).encode('utf-8')
+        stem, extension = name.rsplit('.', 1)
+        filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}.{extension}"
+        (output_dir / filename).write_bytes(content)
+        (output_dir / f"{filename}.gz").write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            (output_dir / f"{filename}.br").write_bytes(brotli.compress(content, quality=11))
+        manifest[name] = filename
+
+        original = sum(len(inline_css_imports(STATIC_DIR / source)) if name.endswith('.css')
+                       else (STATIC_DIR / source).stat().st_size for source in sources)
+        print(f"  {filename}: {len(sources)} files, {original:,} -> {len(content):,} bytes")
+
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    if brotli is None:
+        print("ℹ️  brotli not installed: only .gz variants written")
+    return manifest
+
+def load_manifest(dist_dir=DIST_DIR):
+    """
+    The bundle manifest, or None when the bundles are missing or older than
+    any of their sources (then the templates fall back to the source files).
+    """
+    manifest_path = Path(dist_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    built = manifest_path.stat().st_mtime
+    sources = [path for pattern in ('js/*.js', 'css/*.css') for path in STATIC_DIR.glob(pattern)]
+    if any(path.stat().st_mtime > built for path in sources):
+        print("⚠️  Static bundles are older than their sources, serving the source files "
+              "(rebuild with: python assets.py)")
+        return None
+    return json.loads(manifest_path.read_text(encoding='utf-8'))
+
+def serve_asset(filename):
+    """A bundle from static/dist, precompressed when the client accepts it, cached for a year"""
+    mimetype = 'text/css' if filename.endswith('.css') else 'application/javascript'
+    served, encoding = filename, None
+    for candidate, suffix in PRECOMPRESSED:
+        if request.accept_encodings.quality(candidate) > 0 and (DIST_DIR / f"{filename}{suffix}").is_file():
+            served, encoding = f"{filename}{suffix}", candidate
+            break
+
+    response = send_from_directory(DIST_DIR, served, mimetype=mimetype, max_age=ONE_YEAR)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The name changes with the content, so the file never needs revalidating
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def init_assets(app):
+    """Register /assets/ and the asset_urls() template helper"""
+    manifest = load_manifest() if app.config.get('ASSETS_BUNDLED', True) else None
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+
+    def asset_urls(bundle):
+        """URLs to include for a bundle: the built file, or its sources in order"""
+        if manifest and bundle in manifest:
+            return [url_for('assets', filename=manifest[bundle])]
+        return [url_for('static', filename=source) for source in BUNDLES[bundle]]
+
+    app.jinja_env.globals['asset_urls'] = asset_urls
+    return manifest
+
+if __name__ == "__main__":
+    print("📦 Building static bundles...")
+    build()
+    print(f"✅ Bundles written to {DIST_DIR}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+In-memory autocomplete index for /api/search/autocomplete
+Bigram index over the distinct plate, model and SPJ values, ranked by frequency.
+After the database changes, the value counts are reloaded on a background
+thread while requests keep being answered from the previous index.
+"""
+
+from collections import defaultdict
+import heapq
+import os
+import threading
+import unicodedata
+
+from database import db, data_version, read_engine
+from models import Veiculo
+
+def normalize(value):
+    """Case- and accent-insensitive form used for matching"""
+    decomposed = unicodedata.normalize('NFKD', str(value).casefold())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class AutocompleteIndex:
+    """Substring index over the distinct values of one column"""
+
+    def __init__(self):
+        self.counts = {}                  # value -> number of vehicles
+        self.normalized = {}              # value -> normalize(value)
+        self.postings = defaultdict(set)  # bigram -> values containing it
+
+    def update(self, counts):
+        """Apply a fresh {value: count} snapshot, touching only values that changed"""
+        for value in self.counts.keys() - counts.keys():
+            for gram in bigrams(self.normalized.pop(value)):
+                postings = self.postings[gram]
+                postings.discard(value)
+                if not postings:
+                    del self.postings[gram]
+
+        for value in counts.keys() - self.counts.keys():
+            normalized = normalize(value)
+            self.normalized[value] = normalized
+            for gram in bigrams(normalized):
+                self.postings[gram].add(value)
+
+        self.counts = counts
+
+    def search(self, query, limit):
+        """Values containing query, most frequent first"""
+        normalized_query = normalize(query)
+        grams = bigrams(normalized_query)
+        if not grams:
+            return []
+
+        # Verify candidates from the rarest bigram instead of intersecting all of them
+        candidates = min((self.postings.get(gram, ()) for gram in grams), key=len)
+        matches = [value for value in candidates if normalized_query in self.normalized[value]]
+
+        return heapq.nsmallest(limit, matches, key=lambda value: (-self.counts[value], value))
+
+class AutocompleteService:
+    """Per-process set of indexes, refreshed in the background when the database changes"""
+
+    # (suggestion type, column) in the order suggestions are returned
+    SOURCES = [
+        ('placa', Veiculo.placa_original),
+        ('modelo', Veiculo.modelo),
+        ('spj', Veiculo.spj),
+    ]
+
+    def __init__(self):
+        self.indexes = {kind: AutocompleteIndex() for kind, _ in self.SOURCES}
+        self.version = None
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def load(self, engine, version):
+        """Count the values of every column and apply them to the indexes"""
+        with engine.connect() as connection:
+            snapshots = {
+                kind: dict(connection.execute(
+                    db.select(column, db.func.count(Veiculo.id))
+                    .where(column.isnot(None), column != '')
+                    .group_by(column)
+                ).all())
+                for kind, column in self.SOURCES
+            }
+
+        with self.lock:
+            for kind, counts in snapshots.items():
+                self.indexes[kind].update(counts)
+            self.version = version
+
+    def _refresh(self, engine, version):
+        """Background reload, repeated until no commit landed while it ran"""
+        try:
+            while True:
+                # The counts only change with data_version(): a version already loaded is skipped
+                if version != self.version:
+                    self.load(engine, version)
+                latest = data_version()
+                if latest == version:
+                    break
+                version = latest
+        except Exception as e:
+            print(f"⚠️  Autocomplete refresh failed: {e}")
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def refresh_if_stale(self):
+        """
+        Reload value counts when another connection has committed changes.
+        Only the first load runs in the request; later ones run on a
+        background thread and the current index is served until they finish.
+        """
+        version = data_version()
+        if version == self.version:
+            return
+
+        if self.version is None:
+            self.load(read_engine(), version)
+            return
+
+        with self.lock:
+            # A refresh that finished since the check above may have loaded this version
+            if self.refreshing or version == self.version:
+                return
+            self.refreshing = True
+        threading.Thread(target=self._refresh, args=(read_engine(), version),
+                         name='autocomplete-refresh', daemon=True).start()
+
+    def suggest(self, query, per_type=5, limit=10):
+        """Suggestions in the same shape the endpoint has always returned"""
+        self.refresh_if_stale()
+
+        suggestions = []
+        with self.lock:
+            for kind, _ in self.SOURCES:
+                for value in self.indexes[kind].search(query, per_type):
+                    suggestions.append({
+                        'value': value,
+                        'type': kind
+                    })
+
+        return suggestions[:limit]
+
+# Process-local instance used by the autocomplete endpoint
+autocomplete_index = AutocompleteService()
+
+def _reset_after_fork():
+    """A refresh thread running in the parent does not exist in a forked worker"""
+    autocomplete_index.lock = threading.Lock()
+    autocomplete_index.refreshing = False
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Concurrent-read benchmark for the SQLite connection profile
+Compares the stock setup (rollback journal, one shared pool) with the tuned
+profile from database.py (WAL + PRAGMAs, read-only pool, single writer)
+while a background writer keeps updating rows.
+
+Runs on a temporary copy of the database, the original file is not touched:
+    python bench_sqlite.py [--db veiculosapreendidos.db] [--threads 8] [--seconds 10]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+
+from database import DEFAULT_SQLITE_PRAGMAS, WRITER_ONLY_PRAGMAS, sqlite_uri
+
+# Representative list-page reads: filtered, sorted page plus its count
+READ_QUERIES = [
+    text("SELECT id, spj, status_id, modelo, placaverdadeira FROM veiculos "
+         "WHERE status_id = :status ORDER BY id DESC LIMIT 50 OFFSET :offset"),
+    text("SELECT COUNT(*) FROM veiculos WHERE status_id = :status"),
+    text("SELECT id, modelo FROM veiculos WHERE modelo LIKE :prefix ORDER BY modelo LIMIT 50"),
+]
+
+WRITE_QUERY = text("UPDATE veiculos SET obs2 = :note WHERE id = :id")
+
+def _set_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        for name, value in pragmas.items():
+            dbapi_connection.execute(f"PRAGMA {name} = {value}")
+
+def build_engines(db_path, tuned, threads):
+    """Return (read engine, write engine) for one profile"""
+    if not tuned:
+        # Stock configuration: rollback journal, everything through one pool
+        with sqlite3.connect(db_path) as connection:
+            connection.execute("PRAGMA journal_mode = DELETE")
+        engine = create_engine(sqlite_uri(db_path), pool_size=threads + 1, max_overflow=0)
+        return engine, engine
+
+    writer = create_engine(sqlite_uri(db_path), pool_size=1, max_overflow=0)
+    reader = create_engine(sqlite_uri(db_path, read_only=True),
+                           pool_size=threads, max_overflow=0)
+    _set_pragmas(writer, DEFAULT_SQLITE_PRAGMAS)
+    _set_pragmas(reader, {name: value for name, value in DEFAULT_SQLITE_PRAGMAS.items()
+                          if name not in WRITER_ONLY_PRAGMAS})
+    # Switch the file to WAL before the readers open it
+    with writer.connect():
+        pass
+    return reader, writer
+
+def run_profile(db_path, tuned, threads, seconds):
+    reader, writer = build_engines(db_path, tuned, threads)
+
+    with reader.connect() as connection:
+        statuses = [row[0] for row in connection.execute(
+            text("SELECT id FROM veiculos_status"))]
+        max_id = connection.execute(text("SELECT MAX(id) FROM veiculos")).scalar() or 1
+
+    stop = threading.Event()
+    reads, errors, latencies = [0], [0], []
+    writes = [0]
+    lock = threading.Lock()
+
+    def read_loop(seed):
+        rng = random.Random(seed)
+        local_latencies = []
+        while not stop.is_set():
+            query = rng.choice(READ_QUERIES)
+            params = {'status': rng.choice(statuses), 'offset': rng.randrange(0, 500),
+                      'prefix': rng.choice('ABCFGHMPSTV') + '%'}
+            started = time.perf_counter()
+            try:
+                with reader.connect() as connection:
+                    connection.execute(query, params).all()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            reads[0] += len(local_latencies)
+            latencies.extend(local_latencies)
+
+    def write_loop():
+        rng = random.Random(0)
+        while not stop.is_set():
+            try:
+                with writer.begin() as connection:
+                    for _ in range(20):
+                        connection.execute(WRITE_QUERY, {'note': f'bench {time.time()}',
+                                                         'id': rng.randint(1, max_id)})
+                writes[0] += 1
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=read_loop, args=(seed,)) for seed in range(threads)]
+    workers.append(threading.Thread(target=write_loop))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    reader.dispose()
+    writer.dispose()
+
+    latencies.sort()
+    def percentile(fraction):
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000 if latencies else 0
+
+    return {
+        'reads_per_second': reads[0] / seconds,
+        'write_transactions': writes[0],
+        'errors': errors[0],
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite connection profile benchmark')
+    parser.add_argument('--db', default='veiculosapreendidos.db', help='Database to copy')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent reader threads')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration of each run')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, tuned in (('default', False), ('tuned', True)):
+            db_path = os.path.join(workdir, f'{name}.db')
+            shutil.copyfile(args.db, db_path)
+            print(f"⏱️  {name}: {args.threads} readers + 1 writer for {args.seconds:g}s...")
+            results[name] = run_profile(db_path, tuned, args.threads, args.seconds)
+
+    print(f"\n{'profile':<10}{'reads/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'writes':>9}{'errors':>9}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['reads_per_second']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['write_transactions']:>9}{result['errors']:>9}")
+
+    baseline = results['default']['reads_per_second']
+    if baseline:
+        print(f"\n📈 Tuned read throughput: {results['tuned']['reads_per_second'] / baseline:.2f}x default")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite
+Runs /api/vehicles (per filter combination), /api/search/autocomplete and
+/api/statistics in-process against a synthetic database of a chosen size and
+reports p50/p95/p99 latency and throughput. Results are saved as JSON per
+commit so runs can be compared.
+
+    python benchmark.py --rows 100000
+    python benchmark.py --rows 1000000 --requests 200 --compare benchmark_results/<file>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+
+from synthetic_data import GENERATOR_VERSION, generate_database
+
+RESULTS_DIR = Path('benchmark_results')
+DATA_DIR = Path('bench_data')
+
+# (name, endpoint, query parameters). A '{n}' value is replaced by the request
+# number, making every URL unique so response caches are bypassed; a callable
+# value is called with the request number.
+SCENARIOS = [
+    ('vehicles.default', '/api/vehicles', {}),
+    ('vehicles.per_page_50', '/api/vehicles', {'per_page': 50}),
+    ('vehicles.deep_page', '/api/vehicles', {'page': 500, 'per_page': 50}),
+    ('vehicles.cursor', '/api/vehicles', {'cursor': '', 'per_page': 50}),
+    # A new filter every request, so the page and its exact count are both cold
+    ('vehicles.cold_count', '/api/vehicles', {'per_page': 50,
+                                              'date_from': lambda n: (date(2020, 1, 1) + timedelta(days=n)).isoformat()}),
+    ('vehicles.count_estimate', '/api/vehicles', {'count': 'estimate', 'per_page': 50}),
+    ('vehicles.sparse_fields', '/api/vehicles', {'fields': 'spj,status,modelo,placa_original', 'per_page': 50}),
+    ('vehicles.status', '/api/vehicles', {'status': 'Apreendido'}),
+    ('vehicles.patio', '/api/vehicles', {'patio': '16º DP'}),
+    ('vehicles.patio_outros', '/api/vehicles', {'patio': 'Outros'}),
+    ('vehicles.circunscricao_outros', '/api/vehicles', {'circunscricao': 'Outros'}),
+    ('vehicles.tipo_moto_outros', '/api/vehicles', {'tipo': ['Moto', 'Outros']}),
+    ('vehicles.date_range', '/api/vehicles', {'date_from': '2024-01-01', 'date_to': '2024-06-30'}),
+    ('vehicles.combined', '/api/vehicles', {'status': 'Entregue', 'patio': 'JDN - Atibaia',
+                                            'tipo': 'Carro', 'date_from': '2024-01-01'}),
+    ('vehicles.search_plate', '/api/vehicles', {'search': 'ABC'}),
+    ('vehicles.search_model', '/api/vehicles', {'search': 'honda titan'}),
+    ('vehicles.sort_modelo', '/api/vehicles', {'sort_by': 'modelo', 'sort_order': 'asc'}),
+    ('autocomplete.plate', '/api/search/autocomplete', {'q': 'AB'}),
+    ('autocomplete.model', '/api/search/autocomplete', {'q': 'hond'}),
+    ('statistics.cached', '/api/statistics', {}),
+    ('statistics.uncached', '/api/statistics', {'_': '{n}'}),
+    ('filters.options', '/api/filters/options', {}),
+]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def build_url(endpoint, params, n):
+    def resolve(value):
+        if callable(value):
+            return value(n)
+        return value.replace('{n}', str(n)) if isinstance(value, str) else value
+    values = {key: resolve(value) for key, value in params.items()}
+    query = urlencode(values, doseq=True)
+    return f'{endpoint}?{query}' if query else endpoint
+
+def run_scenario(client_factory, endpoint, params, requests, concurrency, warmup):
+    """Latencies (ms) of `requests` GETs spread over `concurrency` threads"""
+    client = client_factory()
+    for n in range(warmup):
+        client.get(build_url(endpoint, params, -n - 1))
+
+    latencies, failures = [], []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        local_client = client_factory()
+        local = []
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                break
+            started = time.perf_counter()
+            response = local_client.get(build_url(endpoint, params, n))
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code >= 400:
+                failures.append(response.status_code)
+            local.append(elapsed)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(failures),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+
+def git_revision():
+    repository = Path(__file__).parent
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repository,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repository,
+                               capture_output=True, text=True).stdout.strip()
+        return f'{revision}-dirty' if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def prepare_dataset(args):
+    """Generate the synthetic database once per (rows, seed, generator version)"""
+    path = Path(args.db) if args.db else DATA_DIR / f'synthetic-{args.rows}-s{args.seed}-v{GENERATOR_VERSION}.db'
+    if not path.exists():
+        if args.db:
+            print(f"❌ Database not found: {path}")
+            sys.exit(1)
+        print(f"🏗️  Generating {args.rows:,} synthetic vehicles...")
+        generate_database(path, args.rows, args.seed)
+    return path
+
+def load_app(db_path):
+    """Import the app against db_path and bring the schema up to date"""
+    os.environ['VEICULOS_DB_PATH'] = str(db_path.resolve())
+    from app import app
+    from run import prepare_database
+
+    prepare_database()
+    return app
+
+def print_table(results, baseline=None):
+    header = f"{'scenario':<32}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'err':>5}"
+    if baseline:
+        header += f"{'Δp50':>9}{'Δreq/s':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        line = (f"{name:<32}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['throughput_rps']:>9.1f}{result['errors']:>5}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            def change(new, old):
+                return f"{(new - old) / old * 100:+.0f}%" if old else 'n/a'
+            line += (f"{change(result['p50_ms'], previous['p50_ms']):>9}"
+                     f"{change(result['throughput_rps'], previous['throughput_rps']):>9}")
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the API endpoints')
+    parser.add_argument('--rows', type=int, default=100000, help='Synthetic dataset size')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic dataset seed')
+    parser.add_argument('--db', help='Benchmark an existing database instead of a synthetic one (it gets migrated)')
+    parser.add_argument('--requests', type=int, default=100, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Client threads per scenario')
+    parser.add_argument('--only', help='Comma-separated scenario name prefixes to run')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--no-save', action='store_true', help="Don't write a results file")
+    args = parser.parse_args()
+
+    db_path = prepare_dataset(args)
+    app = load_app(db_path)
+
+    scenarios = SCENARIOS
+    if args.only:
+        prefixes = tuple(args.only.split(','))
+        scenarios = [scenario for scenario in SCENARIOS if scenario[0].startswith(prefixes)]
+
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute("SELECT COUNT(*) FROM veiculos").fetchone()[0]
+
+    print(f"⏱️  {len(scenarios)} scenarios x {args.requests} requests "
+          f"(concurrency {args.concurrency}) on {rows:,} vehicles\n")
+
+    results = {}
+    for name, endpoint, params in scenarios:
+        results[name] = run_scenario(app.test_client, endpoint, params,
+                                     args.requests, args.concurrency, args.warmup)
+        print(f"  {name}: p50 {results[name]['p50_ms']:.2f} ms")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            baseline = json.load(handle)['results']
+
+    print()
+    print_table(results, baseline)
+
+    if not args.no_save:
+        revision = git_revision()
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{revision}-{rows}.json"
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'meta': {
+                    'revision': revision,
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'database': str(db_path),
+                    'rows': rows,
+                    'seed': None if args.db else args.seed,
+                    'generator_version': None if args.db else GENERATOR_VERSION,
+                    'requests': args.requests,
+                    'concurrency': args.concurrency,
+                    'python': platform.python_version(),
+                    'sqlite': sqlite3.sqlite_version,
+                    'platform': platform.platform(),
+                },
+                'results': results,
+            }, handle, indent=2)
+        print(f"\n💾 Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Process-local caches invalidated by database writes
+Entries are dropped as soon as database.data_version() changes
+"""
+
+from collections import OrderedDict
+import functools
+import hashlib
+import threading
+
+from flask import current_app, make_response, request
+
+from database import data_version
+
+class VersionedCache:
+    """Bounded LRU mapping that empties itself whenever the database changes"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+
+    def _check_version(self):
+        version = data_version()
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, key, default=None):
+        with self.lock:
+            self._check_version()
+            if key not in self.entries:
+                return default
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def set(self, key, value, version=None):
+        """
+        Store value. Pass the data_version() read before computing it so a
+        result computed across a concurrent write is not cached as fresh.
+        """
+        with self.lock:
+            self._check_version()
+            if version is not None and version != self.version:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+def cached_response(view):
+    """
+    Serve a read-only JSON view from memory until the next database write.
+    Responses carry a strong content-hash ETag, so If-None-Match is answered
+    with 304 without running the view. Responses the view marks no_store
+    (its error fallbacks) are never cached.
+    """
+    store = VersionedCache(max_entries=64)
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.full_path
+        cached = store.get(key)
+
+        if cached is None:
+            version = data_version()
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.cache_control.no_store:
+                return response
+
+            body = response.get_data()
+            cached = (body, response.mimetype, hashlib.sha1(body).hexdigest())
+            store.set(key, cached, version)
+
+        body, mimetype, etag = cached
+        response = current_app.response_class(body, mimetype=mimetype)
+        response.set_etag(etag)
+
+        max_age = current_app.config.get('API_CACHE_MAX_AGE', 0)
+        if max_age:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+        else:
+            # Browsers may keep the body but must revalidate (cheap 304) before reuse
+            response.cache_control.no_cache = True
+
+        return response.make_conditional(request)
+
+    return wrapper
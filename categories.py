@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Filter categories for pátio, circunscrição and tipo
+The single definition of the named options the filter panel offers; any other
+non-NULL value falls into "Outros". The columns are dictionary-encoded (see
+lookups.py), so a category resolves to a short list of integer ids and every
+option, "Outros" included, is an indexed IN lookup.
+"""
+
+OUTROS = "Outros"
+
+# facet -> {option shown in the UI: stored value}
+CATEGORIES = {
+    'patio': {
+        "16º DP": "16º DP",
+        "17º DP": "17º DP",
+        "35º DP": "35º DP",
+        "JDN - Atibaia": "JDN - Atibaia",
+        "-": "-",
+    },
+    'circunscricao': {
+        "16º DP": "16º DP",
+        "17º DP": "17º DP",
+        "35º DP": "35º DP",
+    },
+    # UI shows user-friendly "Moto"/"Carro"; CAMINHONETE and other types go to "Outros"
+    'tipo': {
+        "Moto": "MOTO",
+        "Carro": "CARRO",
+    },
+}
+
+def category_options(facet):
+    """Options offered for a facet, "Outros" last"""
+    return list(CATEGORIES[facet]) + [OUTROS]
+
+def category_values(facet):
+    """Database values that have a named option (everything else is "Outros")"""
+    return list(CATEGORIES[facet].values())
+
+def category_of(facet, value):
+    """Option a stored value belongs to (None stays None)"""
+    if value is None:
+        return None
+    for option, option_value in CATEGORIES[facet].items():
+        if value == option_value:
+            return option
+    return OUTROS
+
+if __name__ == "__main__":
+    for facet in CATEGORIES:
+        print(f"{facet}: {category_options(facet)}")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Negotiated gzip/brotli compression and content-hash ETags for JSON responses
+Bodies of at least COMPRESS_MIN_SIZE bytes are compressed with the best encoding
+the client accepts (brotli only when the optional brotli package is installed).
+The vehicle endpoints get an ETag over the uncompressed body, so a page that
+did not change is answered with 304 and no body.
+"""
+
+import gzip
+import hashlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Views whose JSON responses get a content-hash ETag (cached_response views set their own)
+ETAG_ENDPOINTS = {'get_vehicles', 'get_vehicle_details', 'get_vehicles_batch'}
+
+# Brotli quality 11 is far too slow per request; 5 still beats gzip -6 on size
+BROTLI_QUALITY = 5
+
+def choose_encoding(accept_encodings):
+    """Preferred supported Content-Encoding for an Accept-Encoding header (None: identity)"""
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    qualities = [(accept_encodings.quality(encoding), encoding) for encoding in candidates]
+    quality, encoding = max(qualities, key=lambda item: item[0])
+    return encoding if quality > 0 else None
+
+def compress(body, encoding, level):
+    """Encode a response body; gzip output has no timestamp, so it is reproducible"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def _after_request(response):
+    if (response.status_code != 200 or response.mimetype != 'application/json'
+            or response.is_streamed):
+        return response
+
+    if request.endpoint in ETAG_ENDPOINTS and request.method in ('GET', 'HEAD') \
+            and 'ETag' not in response.headers:
+        response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+        if not response.headers.get('Cache-Control'):
+            # Browsers may keep the body but must revalidate (cheap 304) before reuse
+            response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code != 200:
+            return response
+
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers:
+        return response
+
+    body = response.get_data()
+    if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding, current_app.config['COMPRESS_LEVEL']))
+    response.headers['Content-Encoding'] = encoding
+    # The ETag names the uncompressed content, so the encoded bytes only match it weakly
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_compression(app):
+    """Install the compression/ETag response hook when COMPRESS_ENABLED is set"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+    app.after_request(_after_request)
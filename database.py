@@ -1,26 +1,148 @@
 #!/usr/bin/env python3
 """
 Fixed Database Configuration with absolute path
+Tuned SQLite connection profile with a read-only pool and a single writer
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 import os
+import sqlite3
+import threading
+
+# Applied to every pooled connection through the engine "connect" event.
+# Override per app with app.config['SQLITE_PRAGMAS'].
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers and the writer don't block each other
+    'synchronous': 'NORMAL',      # durable at checkpoints, safe with WAL
+    'cache_size': -64000,         # 64 MB page cache per connection
+    'mmap_size': 268435456,       # 256 MB of the file memory-mapped
+    'temp_store': 'MEMORY',       # sorts and temp B-trees stay in RAM
+    'busy_timeout': 5000,         # wait up to 5s for a lock instead of failing
+}
+
+# Only the writer may change these; read-only connections skip them
+WRITER_ONLY_PRAGMAS = {'journal_mode'}
+
+READ_BIND = 'read'
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to the read-only pool and everything else (flushes,
+    INSERT/UPDATE/DELETE, DDL) to the writer. Once a transaction has written,
+    its reads stay on the writer so they see their own uncommitted changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+
+        engines = self._db.engines
+        is_select = clause is not None and getattr(clause, 'is_select', False)
+
+        if (READ_BIND in engines and is_select and not self._flushing
+                and not self.info.get('has_writes')):
+            return engines[READ_BIND]
+
+        if clause is not None and getattr(clause, 'is_dml', False):
+            self.info['has_writes'] = True
+        return engines[None]
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            self.info['has_writes'] = True
+        super().flush(objects)
+
+    def commit(self):
+        try:
+            super().commit()
+        finally:
+            self.info.pop('has_writes', None)
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self.info.pop('has_writes', None)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.info.pop('has_writes', None)
 
 # Create the database instance
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Dedicated connection used only to poll PRAGMA data_version. The pragma changes
+# whenever *another* connection commits, so it must not be shared with the pool.
+_version_lock = threading.Lock()
+_version_watch = {'path': None, 'connection': None, 'raw': None, 'counter': 0}
+
+def sqlite_uri(db_path, read_only=False):
+    """SQLAlchemy URI for a database file, optionally opened read-only"""
+    if read_only:
+        return f'sqlite:///file:{db_path}?mode=ro&uri=true'
+    return f'sqlite:///{db_path}'
+
+def apply_sqlite_pragmas(engine, pragmas, read_only=False):
+    """Run the connection profile on every new DBAPI connection of an engine"""
+    statements = [
+        f"PRAGMA {name} = {value}"
+        for name, value in pragmas.items()
+        if not (read_only and name in WRITER_ONLY_PRAGMAS)
+    ]
+    
+    @db.event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
 
 def init_db(app):
     """Initialize the database with the Flask app"""
     
     # Use absolute path to ensure we connect to the right database
-    db_path = os.path.abspath('veiculosapreendidos.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    db_path = os.path.abspath(app.config.get('DATABASE_PATH', 'veiculosapreendidos.db'))
+    app.config['SQLALCHEMY_DATABASE_URI'] = sqlite_uri(db_path)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
-    print(f"Database path: {db_path}")
+    # One writer connection; concurrent readers get their own read-only pool
+    read_pool_size = app.config.get('SQLITE_READ_POOL_SIZE', 8)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+        'pool_size': 1,
+        'max_overflow': 0,
+        'pool_timeout': 30,
+    })
+    if read_pool_size:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[READ_BIND] = {
+            'url': sqlite_uri(db_path, read_only=True),
+            'pool_size': read_pool_size,
+            'max_overflow': 0,
+            'pool_timeout': 30,
+        }
+    
+    if app.config.get('STARTUP_DIAGNOSTICS'):
+        print(f"Database path: {db_path}")
+    _version_watch['path'] = db_path
     
     db.init_app(app)
     
+    pragmas = app.config.get('SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            apply_sqlite_pragmas(engine, pragmas, read_only=(bind_key == READ_BIND))
+    
+    # Counting rows costs a full index scan, so only do it when asked
+    if app.config.get('STARTUP_DIAGNOSTICS'):
+        return check_connection(app)
+    return True
+
+def check_connection(app):
+    """Open a connection and count the vehicles (opt-in startup diagnostic)"""
     with app.app_context():
         try:
             # Test connection
@@ -33,5 +155,74 @@ def init_db(app):
             print(f"Database connection error: {e}")
             return False
 
+def read_engine():
+    """Engine of the read-only pool (the writer when the pool is disabled)"""
+    return db.engines.get(READ_BIND, db.engine)
+
+def execute_read(statement):
+    """Execute a Core SELECT on the session's read connection, bypassing the ORM"""
+    return db.session.connection(bind_arguments={'clause': statement}).execute(statement)
+
+def execute_reads(statements):
+    """
+    Run several Core SELECTs in one read transaction on the session's read
+    connection and return their rows, in order. They all see the same snapshot
+    of the database, e.g. a page of results and its total.
+    """
+    connection = db.session.connection(bind_arguments={'clause': statements[0]})
+    if connection.connection.dbapi_connection.in_transaction:
+        # Already inside a transaction (the session has written): one snapshot anyway
+        return [connection.execute(statement).all() for statement in statements]
+    
+    # sqlite3 doesn't open a transaction for SELECTs, so each would get its own snapshot
+    connection.exec_driver_sql("BEGIN")
+    try:
+        return [connection.execute(statement).all() for statement in statements]
+    finally:
+        # Release the snapshot, so the WAL can be checkpointed past it
+        connection.exec_driver_sql("COMMIT")
+
+def data_version():
+    """
+    Return a process-local counter that increases every time a change is
+    committed to the database file, by this process or any other one.
+    Cheap enough (one PRAGMA) to call on every request for cache invalidation.
+    """
+    with _version_lock:
+        if _version_watch['path'] is None:
+            return 0
+        
+        if _version_watch['connection'] is None:
+            _version_watch['connection'] = sqlite3.connect(
+                _version_watch['path'], isolation_level=None, check_same_thread=False
+            )
+        
+        raw = _version_watch['connection'].execute("PRAGMA data_version").fetchone()[0]
+        if raw != _version_watch['raw']:
+            _version_watch['raw'] = raw
+            _version_watch['counter'] += 1
+        
+        return _version_watch['counter']
+
+def _reset_version_watch():
+    """Forked workers must open their own watcher connection"""
+    global _version_lock
+    _version_lock = threading.Lock()
+    _version_watch['connection'] = None
+    _version_watch['raw'] = None
+
+os.register_at_fork(after_in_child=_reset_version_watch)
+
+def reset_engines_after_fork(app):
+    """
+    Drop the pooled connections a preloading parent opened before forking.
+    SQLite handles must not cross fork(), so each worker starts with empty
+    pools and opens its own connections on first use. close=False leaves
+    the parent's connections alone.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
 if __name__ == "__main__":
     print("Fixed database configuration with absolute path")
\ No newline at end of file
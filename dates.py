@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Date parsing helpers shared by the app, the models and the migrations
+The raw date columns in veiculosapreendidos.db are TEXT in mixed formats
+"""
+
+from datetime import datetime
+import re
+
+def parse_date_field(date_value):
+    """
+    Parse various date formats from database to comparable datetime
+    Returns None if unparseable
+    """
+    if not date_value:
+        return None
+
+    date_str = str(date_value).strip()
+
+    # Year only (e.g., "2023")
+    if re.match(r'^\d{4}$', date_str):
+        try:
+            return datetime(int(date_str), 1, 1)
+        except:
+            return None
+
+    # Numeric timestamp
+    if re.match(r'^\d+(?:\.\d+)?$', date_str):
+        try:
+            num = int(float(date_str))
+            # Determine if it's seconds or milliseconds based on length
+            if len(str(num)) <= 10:
+                return datetime.fromtimestamp(num)
+            else:
+                return datetime.fromtimestamp(num / 1000)
+        except:
+            return None
+
+    # Try to parse as standard date formats
+    date_formats = [
+        '%Y-%m-%d',           # 2023-12-25
+        '%d/%m/%Y',           # 25/12/2023
+        '%d-%m-%Y',           # 25-12-2023
+        '%Y/%m/%d',           # 2023/12/25
+        '%Y-%m-%d %H:%M:%S',  # 2023-12-25 10:30:00
+        '%d/%m/%Y %H:%M:%S',  # 25/12/2023 10:30:00
+    ]
+
+    for fmt in date_formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except:
+            continue
+
+    # If all else fails, try generic parsing
+    try:
+        return datetime.fromisoformat(date_str.replace('/', '-'))
+    except:
+        return None
+
+if __name__ == "__main__":
+    for sample in ["2023", "25/12/2023", "2023-12-25 10:30:00", "1703500000", "invalid"]:
+        print(f"{sample!r} -> {parse_date_field(sample)}")
@@ -2,12 +2,45 @@
 """
 Database Structure Inspector for veiculosapreendidos.db
 This script will examine the database structure and help us map the tables.
+--profile computes full-table column statistics; --advise-indexes proposes indexes.
 """
 
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import hashlib
+import io
+import math
+import os
+import re
 import sqlite3
-import pandas as pd
+import tempfile
+import time
+import unicodedata
 from pathlib import Path
 
+# Column profiling: exact distinct/top-k counting up to this many distinct values
+# per column, then HyperLogLog and Space-Saving sketches with bounded memory
+EXACT_DISTINCT_LIMIT = 50000
+HLL_PRECISION = 14
+TOP_K = 5
+PROFILE_FETCH_SIZE = 10000
+# Tables with at least this many rowids are split into rowid ranges across workers
+PROFILE_SHARD_ROWS = 100000
+
+def format_rows(columns, rows, max_width=30):
+    """Plain-text table of query rows"""
+    def cell(value):
+        text = '' if value is None else str(value).replace('\n', ' ')
+        return text if len(text) <= max_width else text[:max_width - 1] + '…'
+    
+    cells = [[cell(value) for value in row] for row in rows]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)]
+    lines = [' '.join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += [' '.join(value.ljust(width) for value, width in zip(row, widths)) for row in cells]
+    return '\n'.join(lines)
+
 def inspect_database(db_path):
     """Inspect the database structure and content"""
     
@@ -57,15 +90,9 @@ def inspect_database(db_path):
             # Show sample data if table has rows
             if row_count > 0:
                 print(f"\n📄 Sample data (first 3 rows):")
-                df = pd.read_sql_query(f"SELECT * FROM {table_name} LIMIT 3", conn)
-                print(df.to_string(index=False))
-                
-                # Show column statistics for better understanding
-                print(f"\n📊 Column Statistics:")
-                for col in df.columns:
-                    non_null_count = df[col].notna().sum()
-                    unique_count = df[col].nunique()
-                    print(f"  {col}: {non_null_count}/{len(df)} non-null, {unique_count} unique values")
+                cursor.execute(f'SELECT * FROM "{table_name}" LIMIT 3')
+                print(format_rows([d[0] for d in cursor.description], cursor.fetchall()))
+                print(f"\n💡 Full-table column statistics: python db_inspector.py --profile {table_name}")
             
             print("\n" + "-" * 40)
         
@@ -139,9 +166,525 @@ def generate_sqlalchemy_models(db_path):
     except Exception as e:
         print(f"❌ Error generating models: {e}")
 
+def _stable_hash(value):
+    """
+    64-bit hash that is the same in every process (str hashes are salted per
+    interpreter), so sketches built by different workers can be merged.
+    """
+    if isinstance(value, str):
+        data = b's' + value.encode('utf-8', 'surrogatepass')
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = b'b' + bytes(value)
+    else:
+        data = b'n' + repr(value).encode('ascii')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**precision one-byte registers (~0.8% error at p=14)"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def update(self, values):
+        registers = self.registers
+        shift = 64 - self.precision
+        mask = (1 << shift) - 1
+        for value in values:
+            x = _stable_hash(value)
+            index = x >> shift
+            rank = shift - (x & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+class FrequentItems:
+    """
+    Misra-Gries heavy hitters with a fixed number of counters. Counts are
+    lower bounds, short by at most `error`; values rarer than that may be missing.
+    """
+
+    def __init__(self, capacity, counts=None):
+        self.capacity = capacity
+        self.counts = Counter(counts or {})
+        self.error = 0
+        self._shrink()
+
+    def update(self, values):
+        counts = self.counts
+        for value in values:
+            counts[value] += 1
+            if len(counts) > self.capacity:
+                self._shrink()
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.error += other.error
+        self._shrink()
+
+    def _shrink(self):
+        # Subtract the (capacity+1)-th largest count from every counter and drop the non-positive ones
+        if len(self.counts) <= self.capacity:
+            return
+        cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = Counter({value: count - cut for value, count in self.counts.items() if count > cut})
+        self.error += cut
+
+    def most_common(self, k):
+        return self.counts.most_common(k)
+
+def _sort_key(value):
+    # SQLite ordering across storage classes: numbers < text < blobs
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, bytes(value))
+
+class ColumnProfile:
+    """
+    Null count, distinct cardinality, min/max and top-k of one column, fed a
+    batch of values at a time. Profiles of disjoint row ranges can be merged.
+    """
+
+    def __init__(self, name, exact_limit=EXACT_DISTINCT_LIMIT, top_k=TOP_K):
+        self.name = name
+        self.exact_limit = exact_limit
+        self.top_k = top_k
+        self.nulls = 0
+        self.minimum = self.maximum = None
+        self.counts = Counter()
+        self.distinct_sketch = None
+        self.frequent = None
+
+    def update(self, values):
+        present = [value for value in values if value is not None]
+        self.nulls += len(values) - len(present)
+        if not present:
+            return
+
+        try:
+            low, high = min(present), max(present)
+        except TypeError:  # mixed storage classes in one column
+            low, high = min(present, key=_sort_key), max(present, key=_sort_key)
+        self._extend_range(low, high)
+
+        if self.distinct_sketch is None:
+            self.counts.update(present)
+            if len(self.counts) > self.exact_limit:
+                self._switch_to_sketches()
+        else:
+            self.distinct_sketch.update(present)
+            self.frequent.update(present)
+
+    def _extend_range(self, low, high):
+        if low is None:
+            return
+        if self.minimum is None or _sort_key(low) < _sort_key(self.minimum):
+            self.minimum = low
+        if self.maximum is None or _sort_key(high) > _sort_key(self.maximum):
+            self.maximum = high
+
+    def _switch_to_sketches(self):
+        self.distinct_sketch = HyperLogLog()
+        self.distinct_sketch.update(self.counts)
+        self.frequent = FrequentItems(self.top_k * 20, self.counts)
+        self.counts = None
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        self._extend_range(other.minimum, other.maximum)
+        if self.distinct_sketch is None and other.distinct_sketch is None:
+            self.counts.update(other.counts)
+            if len(self.counts) > self.exact_limit:
+                self._switch_to_sketches()
+            return
+
+        if self.distinct_sketch is None:
+            self._switch_to_sketches()
+        if other.distinct_sketch is None:
+            self.distinct_sketch.update(other.counts)
+            self.frequent.merge(FrequentItems(self.frequent.capacity, other.counts))
+        else:
+            self.distinct_sketch.merge(other.distinct_sketch)
+            self.frequent.merge(other.frequent)
+
+    def result(self):
+        exact = self.distinct_sketch is None
+        if exact:
+            top = self.counts.most_common(self.top_k)
+        else:
+            # Only values seen more often than the sketch error are known heavy hitters
+            top = [(value, count) for value, count in self.frequent.most_common(self.top_k) if count > 1]
+        return {
+            'column': self.name,
+            'nulls': self.nulls,
+            'distinct': len(self.counts) if exact else self.distinct_sketch.count(),
+            'exact': exact,
+            'min': self.minimum,
+            'max': self.maximum,
+            'top': top,
+        }
+
+def profile_table(db_path, table_name, exact_limit=EXACT_DISTINCT_LIMIT, top_k=TOP_K, rowid_range=None):
+    """
+    Profile every column of a table (or of a rowid range of it) in one
+    streaming pass. Returns (row count, [ColumnProfile]).
+    """
+    conn = sqlite3.connect(f'file:{Path(db_path).resolve()}?mode=ro', uri=True)
+    try:
+        sql = f'SELECT * FROM "{table_name}"'
+        parameters = ()
+        if rowid_range is not None:
+            sql += ' WHERE rowid BETWEEN ? AND ?'
+            parameters = rowid_range
+        cursor = conn.execute(sql, parameters)
+        profiles = [ColumnProfile(d[0], exact_limit, top_k) for d in cursor.description]
+        rows = 0
+        while True:
+            batch = cursor.fetchmany(PROFILE_FETCH_SIZE)
+            if not batch:
+                break
+            rows += len(batch)
+            # Column-wise over the batch, so counting runs in Counter.update
+            for profile, values in zip(profiles, zip(*batch)):
+                profile.update(values)
+    finally:
+        conn.close()
+    return rows, profiles
+
+def _profile_job(job):
+    table_name = job[1]
+    return table_name, profile_table(*job)
+
+def _profile_jobs(db_path, tables, workers, exact_limit, top_k):
+    """
+    One job per table; large rowid tables are split into `workers` rowid
+    ranges so a single big table still uses every worker. Each row is read once.
+    """
+    conn = sqlite3.connect(f'file:{Path(db_path).resolve()}?mode=ro', uri=True)
+    jobs = []
+    try:
+        for table in tables:
+            try:
+                low, high = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table}"').fetchone()
+            except sqlite3.OperationalError:  # WITHOUT ROWID table
+                low = high = None
+            if workers > 1 and low is not None and high - low >= PROFILE_SHARD_ROWS:
+                step = (high - low) // workers + 1
+                for start in range(low, high + 1, step):
+                    jobs.append((db_path, table, exact_limit, top_k, (start, start + step - 1)))
+            else:
+                jobs.append((db_path, table, exact_limit, top_k, None))
+    finally:
+        conn.close()
+    return jobs
+
+def profile_database(db_path, tables=None, workers=None, exact_limit=EXACT_DISTINCT_LIMIT, top_k=TOP_K):
+    """Profile tables in parallel worker processes, one streaming pass over each"""
+    if not Path(db_path).exists():
+        print(f"❌ Database file not found: {db_path}")
+        return []
+    
+    conn = sqlite3.connect(f'file:{Path(db_path).resolve()}?mode=ro', uri=True)
+    # Virtual tables and their shadow tables (the FTS index) are not profiled
+    shadow = re.compile('|'.join(
+        re.escape(name) + r'_\w+' for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'")
+    ) or '$^')
+    all_tables = [name for (name, sql) in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ) if not sql.startswith('CREATE VIRTUAL TABLE') and not shadow.fullmatch(name)]
+    conn.close()
+    
+    tables = [table for table in all_tables if not tables or table in tables]
+    workers = workers or os.cpu_count() or 1
+    jobs = _profile_jobs(db_path, tables, workers, exact_limit, top_k)
+    workers = max(min(workers, len(jobs)), 1)
+    print(f"📊 Profiling {len(tables)} tables ({len(jobs)} jobs, {workers} workers): {db_path}")
+    print("=" * 60)
+    
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_profile_job, jobs))
+    else:
+        parts = [_profile_job(job) for job in jobs]
+    
+    merged = {}
+    for table, (rows, profiles) in parts:
+        if table not in merged:
+            merged[table] = [rows, profiles]
+            continue
+        merged[table][0] += rows
+        for profile, other in zip(merged[table][1], profiles):
+            profile.merge(other)
+    
+    results = []
+    for table in tables:
+        rows, profiles = merged[table]
+        result = {'table': table, 'rows': rows, 'columns': [profile.result() for profile in profiles]}
+        print_profile(result, top_k)
+        results.append(result)
+    
+    total_rows = sum(result['rows'] for result in results)
+    print(f"\n✅ Profiled {total_rows:,} rows in {time.perf_counter() - started:.1f}s")
+    return results
+
+def print_profile(result, top_k=TOP_K):
+    def short(value, width=24):
+        text = str(value).replace('\n', ' ')
+        return text if len(text) <= width else text[:width - 1] + '…'
+    
+    rows = result['rows']
+    print(f"\n🗂️  {result['table']}: {rows:,} rows")
+    print(f"  {'column':<24}{'nulls':>16}{'distinct':>12}  {'min':<20}{'max':<20}top {top_k}")
+    for column in result['columns']:
+        nulls = f"{column['nulls']:,} ({column['nulls'] / rows * 100:.0f}%)" if rows else '0'
+        distinct = f"{'' if column['exact'] else '≈'}{column['distinct']:,}"
+        if column['top']:
+            top = ', '.join(f"{short(value, 16)}×{'' if column['exact'] else '≥'}{count:,}"
+                            for value, count in column['top'])
+        else:
+            top = '(no repeated values)' if column['distinct'] else ''
+        low = short(column['min'], 18) if column['min'] is not None else '-'
+        high = short(column['max'], 18) if column['max'] is not None else '-'
+        print(f"  {short(column['column']):<24}{nulls:>16}{distinct:>12}  {low:<20}{high:<20}{top}")
+
+# table.column references in SQLAlchemy-generated SQL: veiculos.status, veiculos."pátio"
+COLUMN_REFERENCE = r'(\w+)\.(?:"([^"]+)"|(\w+))'
+EQUALITY_PREDICATE = re.compile(COLUMN_REFERENCE + r' (?:= \?|IN \()')
+RANGE_PREDICATE = re.compile(COLUMN_REFERENCE + r' (?:>=|<=|>|<) \?')
+ORDER_TERM = re.compile(COLUMN_REFERENCE + r'(?: (ASC|DESC))?')
+CLAUSE_END = r'(?= ORDER BY | GROUP BY | LIMIT |\) AS |\)$|$)'
+WHERE_CLAUSE = re.compile(r' WHERE (.*?)' + CLAUSE_END)
+ORDER_CLAUSE = re.compile(r' ORDER BY (.*?)(?= LIMIT |\) AS |\)$|$)')
+SELECT_LIST = re.compile(r'^SELECT (.*?) FROM (\w+)')
+
+# Narrow SELECT lists get a covering index (all selected columns appended)
+MAX_COVERING_COLUMNS = 4
+
+def _references(pattern, text):
+    return [(match.group(1), match.group(2) or match.group(3)) for match in pattern.finditer(text)]
+
+def existing_indexes(conn):
+    """{table: [column tuple of each index]} for the live database"""
+    indexes = defaultdict(list)
+    for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'"):
+        for index in conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+            columns = tuple(row[2] for row in conn.execute(f'PRAGMA index_info("{index[1]}")'))
+            indexes[table].append(columns)
+    return indexes
+
+def propose_index(sql):
+    """
+    (table, columns, covering) for a captured SELECT: equality columns first,
+    then the ORDER BY columns (or the range column), so SQLite can seek and
+    read rows already in order instead of scanning and sorting.
+    """
+    where = WHERE_CLAUSE.search(sql)
+    order = ORDER_CLAUSE.search(sql)
+    where_text = where.group(1) if where else ''
+
+    equality = _references(EQUALITY_PREDICATE, where_text)
+    ranges = _references(RANGE_PREDICATE, where_text)
+    ordering = _references(ORDER_TERM, order.group(1)) if order else []
+
+    table = (equality or ordering or ranges or [(None, None)])[0][0]
+    if table is None:
+        return None
+
+    columns = sorted({column for t, column in equality if t == table})
+    trailing = [column for t, column in ordering if t == table] or [column for t, column in ranges if t == table][:1]
+    for column in trailing:
+        if column not in columns and column != 'id':
+            columns.append(column)
+    if not columns:
+        return None
+
+    covering = False
+    selected = SELECT_LIST.search(sql)
+    if selected and selected.group(2) == table and '(' not in selected.group(1):
+        selected_columns = [column for t, column in _references(re.compile(COLUMN_REFERENCE), selected.group(1))
+                            if t == table and column != 'id']
+        extra = [column for column in selected_columns if column not in columns]
+        if extra and len(selected_columns) <= MAX_COVERING_COLUMNS:
+            columns.extend(extra)
+            covering = True
+
+    return table, tuple(columns), covering
+
+def _index_name(table, columns):
+    def ascii_name(column):
+        decomposed = unicodedata.normalize('NFKD', column).encode('ascii', 'ignore').decode()
+        return re.sub(r'\W+', '', decomposed) or 'col'
+    slug = '_'.join(ascii_name(column) for column in columns)
+    return f'ix_{table}_{slug}'
+
+def advise_indexes(db_path, entries, verify=False):
+    """
+    Print composite/covering index proposals for the flagged queries of a slow-query log.
+    verify=True drops the proposals that remove no flag from their example queries.
+    """
+    print(f"\n🧭 Index advisor: {len(entries)} captured queries")
+    print("=" * 60)
+
+    conn = sqlite3.connect(db_path)
+    indexes = existing_indexes(conn)
+    proposals = {}
+
+    for entry in entries:
+        if not entry.get('flags'):
+            continue
+        proposal = propose_index(entry['sql'])
+        if proposal is None:
+            continue
+        table, columns, covering = proposal
+        # An existing index that starts with the proposed columns already serves the query
+        if any(existing[:len(columns)] == columns for existing in indexes[table]):
+            continue
+        stats = proposals.setdefault(proposal, {'queries': 0, 'total_ms': 0.0, 'flags': set(), 'examples': []})
+        stats['queries'] += 1
+        stats['total_ms'] += entry['duration_ms']
+        stats['flags'].update(entry['flags'])
+        if len(stats['examples']) < 3:
+            stats['examples'].append(entry)
+
+    if not proposals:
+        print("✅ No index proposals: captured queries use indexes and need no temp sorts")
+        conn.close()
+        return []
+
+    ranked = sorted(proposals.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+    statements = []
+    for (table, columns, covering), stats in ranked:
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        statement = f'CREATE INDEX IF NOT EXISTS {_index_name(table, columns)} ON {table} ({column_list});'
+
+        kind = 'covering' if covering else ('composite' if len(columns) > 1 else 'single-column')
+        print(f"\n📌 {kind} index on {table}({', '.join(columns)})")
+        print(f"   {stats['queries']} queries, {stats['total_ms']:.1f} ms total; {', '.join(sorted(stats['flags']))}")
+        print(f"   {statement}")
+
+        if verify and not _verify_proposal(conn, table, columns, stats['examples']):
+            print("   ✘ dropped: the index removes no flag from the example queries")
+            continue
+        statements.append(statement)
+
+    conn.close()
+    return statements
+
+def _verify_proposal(conn, table, columns, examples):
+    """
+    Create the index inside a transaction, re-explain example queries, then roll back.
+    Returns whether the index removed a flag from any of them.
+    """
+    from slow_queries import analyze_plan
+
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    improved = False
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f'CREATE INDEX _advisor_candidate ON {table} ({column_list})')
+        for entry in examples:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {entry['sql']}", entry['parameters']).fetchall()
+            remaining = analyze_plan(plan)
+            fixed = sorted(set(entry['flags']) - set(remaining))
+            still = f" (still: {', '.join(remaining)})" if remaining else ''
+            if fixed:
+                print(f"   ✔ verified: {', '.join(fixed)}{still}")
+            else:
+                print(f"   ✘ not verified: no flag removed{still}")
+            improved |= bool(fixed)
+    finally:
+        conn.execute("ROLLBACK")
+    return improved
+
+# get_vehicles parameter combinations replayed by --replay
+REPLAY_SORTS = ['id', 'spj', 'status', 'modelo', 'placa_original', 'ano']
+REPLAY_FILTERS = [{}, {'patio': '16º DP'}, {'patio': 'Outros'}, {'tipo': 'Moto'}, {'circunscricao': '35º DP'}]
+
+def replay_workload(db_path):
+    """
+    Run the status x sort x filter combinations get_vehicles serves against
+    db_path with every query captured, and return the slow-query log entries.
+    """
+    from slow_queries import read_log
+
+    log_path = Path(tempfile.mkdtemp()) / 'replay.jsonl'
+    os.environ['VEICULOS_DB_PATH'] = str(Path(db_path).resolve())
+    os.environ['SLOW_QUERY_MS'] = '0'
+    os.environ['SLOW_QUERY_LOG'] = str(log_path)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import app
+
+    conn = sqlite3.connect(db_path)
+    statuses = [row[0] for row in conn.execute("SELECT value FROM veiculos_status")]
+    conn.close()
+
+    client = app.test_client()
+    requests = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for status in [''] + statuses:
+            for sort_by in REPLAY_SORTS:
+                for sort_order in ('asc', 'desc'):
+                    for extra in REPLAY_FILTERS:
+                        params = dict(extra, status=status, sort_by=sort_by, sort_order=sort_order, per_page=20)
+                        client.get('/api/vehicles', query_string=params)
+                        requests += 1
+
+    print(f"🔁 Replayed {requests} /api/vehicles requests")
+    return read_log(log_path) if log_path.exists() else []
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Inspect veiculosapreendidos.db')
+    parser.add_argument('--db', default='veiculosapreendidos.db', help='Database file')
+    parser.add_argument('--advise-indexes', metavar='LOG', nargs='?', const='slow_queries.jsonl',
+                        help='Propose indexes from a slow-query log (default: slow_queries.jsonl)')
+    parser.add_argument('--replay', action='store_true',
+                        help='With --advise-indexes: capture a get_vehicles workload instead of reading a log')
+    parser.add_argument('--verify', action='store_true',
+                        help='With --advise-indexes: check each proposal by re-explaining its queries')
+    parser.add_argument('--profile', metavar='TABLE', nargs='*',
+                        help='Full-table column statistics (all tables when none are named)')
+    parser.add_argument('--workers', type=int, help='With --profile: parallel worker processes')
+    parser.add_argument('--exact-limit', type=int, default=EXACT_DISTINCT_LIMIT,
+                        help='With --profile: distinct values counted exactly before switching to sketches')
+    parser.add_argument('--top-k', type=int, default=TOP_K, help='With --profile: most frequent values shown')
+    args = parser.parse_args()
+    
     # Database path
-    db_path = "veiculosapreendidos.db"
+    db_path = args.db
+    
+    if args.profile is not None:
+        profile_database(db_path, args.profile, args.workers, args.exact_limit, args.top_k)
+        raise SystemExit(0)
+    
+    if args.advise_indexes or args.replay:
+        from slow_queries import read_log
+        
+        if args.replay:
+            entries = replay_workload(db_path)
+        elif Path(args.advise_indexes).exists():
+            entries = read_log(args.advise_indexes)
+        else:
+            print(f"❌ Slow-query log not found: {args.advise_indexes}")
+            print("💡 Capture one with SLOW_QUERY_MS=50 python run.py, or use --replay")
+            raise SystemExit(1)
+        
+        advise_indexes(db_path, entries, verify=args.verify)
+        raise SystemExit(0)
     
     # Inspect database structure
     inspect_database(db_path)
@@ -154,4 +697,4 @@ if __name__ == "__main__":
     print(f"  1. Review the database structure above")
     print(f"  2. Use the SQLAlchemy model suggestions to create models.py")
     print(f"  3. Create the Flask application with appropriate routes")
-    print(f"  4. Update the frontend to work with real data")
\ No newline at end of file
+    print(f"  4. Update the frontend to work with real data")
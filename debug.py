@@ -4,10 +4,36 @@ Step-by-Step Debugging Script
 Let's find exactly what's failing
 """
 
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
 import sys
+import tempfile
 import traceback
 from pathlib import Path
 
+# Cold-import budget for "import app"; every worker spawn and script pays it
+IMPORT_TIME_BUDGET_MS = 1000
+
+REPO_DIR = Path(__file__).parent
+
+def _run_python(args, db_path):
+    """Run a Python script/-c snippet of the repo against db_path; None (and the output) on failure"""
+    result = subprocess.run([sys.executable, *args], cwd=REPO_DIR, capture_output=True, text=True,
+                            env=dict(os.environ, VEICULOS_DB_PATH=str(db_path)))
+    if result.returncode != 0:
+        print(f"❌ {' '.join(args)[:80]} failed:\n{(result.stdout + result.stderr)[-2000:]}")
+        return None
+    return result.stdout
+
+def _migrated_copy(source, db_path):
+    """Copy a database of the repo to db_path and migrate it; False on failure"""
+    shutil.copyfile(REPO_DIR / source, db_path)
+    return _run_python(['init_db.py', '--migrate'], db_path) is not None
+
 def check_files():
     """Check if all required files exist"""
     print("🔍 Step 1: Checking Files")
@@ -117,6 +143,191 @@ def test_app_import():
         traceback.print_exc()
         return False
 
+def check_import_time(budget_ms=IMPORT_TIME_BUDGET_MS, source='veiculosapreendidos.db'):
+    """
+    Measure "import app" in a fresh interpreter with -X importtime, against a
+    migrated copy of the database (creating the app migrates a stale schema,
+    which is a one-off cost and must not touch the bundled file)
+    """
+    print(f"\n🔍 Step 5b: Checking Import Time")
+    print("=" * 40)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / 'import.db'
+        if not _migrated_copy(source, db_path):
+            return False
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import app'],
+            cwd=REPO_DIR, capture_output=True, text=True,
+            env=dict(os.environ, VEICULOS_DB_PATH=str(db_path))
+        )
+    if result.returncode != 0:
+        print(f"❌ import app failed:\n{result.stderr[-2000:]}")
+        return False
+    
+    # Lines look like "import time:  self [us] | cumulative | <indent>name"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative), name.rstrip()[1:]))
+    
+    total_ms = next(us for us, name in modules if name.strip() == 'app') / 1000
+    direct = sorted((m for m in modules if m[1].startswith('  ') and not m[1].startswith('   ')),
+                    reverse=True)[:5]
+    for us, name in direct:
+        print(f"   {us / 1000:8.1f} ms  {name.strip()}")
+    
+    if total_ms > budget_ms:
+        print(f"❌ import app took {total_ms:.0f} ms (budget {budget_ms} ms)")
+        return False
+    
+    print(f"✅ import app took {total_ms:.0f} ms (budget {budget_ms} ms)")
+    return True
+
+def check_reimport_updates(rows=300):
+    """
+    Re-import rows that are already in the database and check they are updated,
+    not duplicated, including rows whose stored chassi predates normalization
+    (lowercase) and records matched only by chassi.
+    """
+    print(f"\n🔍 Step 5c: Checking Re-import Upserts")
+    print("=" * 40)
+    
+    from synthetic_data import generate_database
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / 'reimport.db'
+        export_path = Path(workdir) / 'reimport.csv'
+        generate_database(db_path, rows)
+        
+        if _run_python(['init_db.py', '--migrate'], db_path) is None:
+            return False
+        
+        with sqlite3.connect(db_path) as connection:
+            connection.execute("UPDATE veiculos SET chassi = lower(chassi)")
+            existing = connection.execute("SELECT spj, chassi FROM veiculos").fetchall()
+        
+        # Every other record carries only the chassi, so it must match on that
+        with open(export_path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(['spj', 'chassi', 'cor'])
+            for index, (spj, chassi) in enumerate(existing):
+                writer.writerow(['' if index % 2 and chassi else spj, chassi, 'REIMPORT'])
+        
+        if _run_python(['init_db.py', '--import', str(export_path)], db_path) is None:
+            return False
+        
+        with sqlite3.connect(db_path) as connection:
+            total, updated = connection.execute(
+                "SELECT COUNT(*), SUM(cor = 'REIMPORT') FROM veiculos"
+            ).fetchone()
+    
+    if total != len(existing) or updated != len(existing):
+        print(f"❌ Re-import of {len(existing)} rows left {total} rows, {updated} updated")
+        return False
+    
+    print(f"✅ Re-import of {len(existing)} rows updated them all, no duplicates")
+    return True
+
+# Columns the search box has always matched with ILIKE '%text%'
+SEARCH_COLUMNS = ['placaverdadeira', 'placaostentada', 'modelo', 'spj', 'chassi', 'proprietário']
+
+SEARCH_TOTALS_SCRIPT = """
+import json, sys
+from app import app
+client = app.test_client()
+totals = [client.get('/api/vehicles', query_string={'search': term, 'count': 'exact'})
+          .get_json()['pagination']['total'] for term in sys.argv[1:]]
+print(json.dumps(totals))
+"""
+
+def check_search_substrings(source='veiculosapreendidos.db'):
+    """
+    Check that /api/vehicles?search= still finds a term anywhere inside the
+    searched columns (a chassi suffix, part of a model, LIKE wildcards), with
+    the same totals as a plain ILIKE '%term%' over the table.
+    """
+    print(f"\n🔍 Step 5d: Checking Substring Search")
+    print("=" * 40)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / 'search.db'
+        if not _migrated_copy(source, db_path):
+            return False
+        
+        with sqlite3.connect(db_path) as connection:
+            chassi = connection.execute(
+                "SELECT chassi FROM veiculos WHERE length(chassi) >= 12 ORDER BY id LIMIT 1"
+            ).fetchone()
+            terms = ([chassi[0][-6:]] if chassi else []) + ['onda', '160', 'a%', 'x']
+            condition = ' OR '.join(f'lower("{column}") LIKE lower(?)' for column in SEARCH_COLUMNS)
+            expected = [
+                connection.execute(f"SELECT COUNT(*) FROM veiculos WHERE {condition}",
+                                   [f'%{term}%'] * len(SEARCH_COLUMNS)).fetchone()[0]
+                for term in terms
+            ]
+        
+        output = _run_python(['-c', SEARCH_TOTALS_SCRIPT, *terms], db_path)
+        if output is None:
+            return False
+        actual = json.loads(output.strip().splitlines()[-1])
+    
+    failed = False
+    for term, want, got in zip(terms, expected, actual):
+        mark = '✅' if want == got else '❌'
+        failed |= want != got
+        print(f"{mark} search={term!r}: {got} rows (ILIKE: {want})")
+    return not failed
+
+# Exact Content-Type of each /api/vehicles/export format (Flask adds the charset to text types)
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+EXPORT_HEADERS_SCRIPT = """
+import json, sys
+from app import app
+client = app.test_client()
+headers = {}
+for export_format in sys.argv[1:]:
+    response = client.get('/api/vehicles/export', query_string={'format': export_format, 'status': 'Entregue'})
+    headers[export_format] = [response.status_code, response.headers.get('Content-Type')]
+print(json.dumps(headers))
+"""
+
+def check_export_content_types(source='veiculosapreendidos.db'):
+    """
+    Check the Content-Type header /api/vehicles/export sends for each format, e.g. that
+    the CSV charset parameter appears exactly once. Formats whose optional
+    dependency is missing (501) are skipped.
+    """
+    print(f"\n🔍 Step 5e: Checking Export Content Types")
+    print("=" * 40)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / 'export.db'
+        if not _migrated_copy(source, db_path):
+            return False
+        output = _run_python(['-c', EXPORT_HEADERS_SCRIPT, *EXPORT_CONTENT_TYPES], db_path)
+        if output is None:
+            return False
+        headers = json.loads(output.strip().splitlines()[-1])
+    
+    failed = False
+    for export_format, expected in EXPORT_CONTENT_TYPES.items():
+        status, content_type = headers[export_format]
+        if status == 501:
+            print(f"⚠️  {export_format}: skipped, optional dependency not installed")
+            continue
+        ok = status == 200 and content_type == expected
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {export_format}: {status} {content_type!r} (expected {expected!r})")
+    return not failed
+
 def test_database_connection():
     """Test actual database connection"""
     print(f"\n🔍 Step 6: Testing Database Connection")
@@ -183,7 +394,7 @@ def run_simple_test():
         count = cursor.fetchone()[0]
         print(f"✅ Direct SQLite: {count} vehicles")
         
-        cursor.execute("SELECT spj, status FROM veiculos LIMIT 1")
+        cursor.execute("SELECT spj, (SELECT value FROM veiculos_status WHERE id = status_id) FROM veiculos LIMIT 1")
         sample = cursor.fetchone()
         print(f"✅ Sample: SPJ={sample[0]}, Status={sample[1]}")
         
@@ -206,6 +417,10 @@ def main():
         ("Database Import", test_database_import),
         ("Models Import", test_models_import),
         ("App Import", test_app_import),
+        ("Import Time", check_import_time),
+        ("Re-import Upserts", check_reimport_updates),
+        ("Substring Search", check_search_substrings),
+        ("Export Content Types", check_export_content_types),
         ("Database Connection", test_database_connection),
         ("App Startup", test_app_startup),
         ("Direct Test", run_simple_test)
@@ -229,4 +444,17 @@ def main():
     print(f"\n📋 NEXT: Tell me which step failed and I'll fix it!")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--import-budget':
+        # CI gate: python debug.py --import-budget [MS]
+        budget = int(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_TIME_BUDGET_MS
+        sys.exit(0 if check_import_time(budget) else 1)
+    if len(sys.argv) > 1 and sys.argv[1] == '--reimport':
+        # CI gate: python debug.py --reimport
+        sys.exit(0 if check_reimport_updates() else 1)
+    if len(sys.argv) > 1 and sys.argv[1] == '--search':
+        # CI gate: python debug.py --search
+        sys.exit(0 if check_search_substrings() else 1)
+    if len(sys.argv) > 1 and sys.argv[1] == '--export':
+        # CI gate: python debug.py --export
+        sys.exit(0 if check_export_content_types() else 1)
     main()
\ No newline at end of file
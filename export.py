@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk export of filtered vehicles for /api/vehicles/export
+Rows are read in batches from a streaming cursor and encoded as CSV, NDJSON or Parquet
+"""
+
+import csv
+import io
+import json
+
+from database import read_engine
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+class ExportUnavailable(RuntimeError):
+    """Raised when the requested format needs an optional dependency that is missing"""
+
+def stream_batches(statement, batch_size):
+    """
+    Yield lists of rows from a streaming cursor on a dedicated connection.
+    The connection is closed as soon as the generator is, including when the
+    client disconnects mid-download and the server closes the response.
+    """
+    with read_engine().connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=batch_size
+        ).execute(statement)
+        try:
+            for batch in result.partitions():
+                yield batch
+        finally:
+            result.close()
+
+def encode_csv(batches, fields, serialize):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(fields)
+    for batch in batches:
+        for row in batch:
+            data = serialize(row)
+            writer.writerow([data[field] for field in fields])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def encode_ndjson(batches, fields, serialize):
+    for batch in batches:
+        lines = [json.dumps(serialize(row), ensure_ascii=False) for row in batch]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands the bytes written so far to the caller"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def encode_parquet(batches, fields, serialize):
+    """One Parquet row group per batch, streamed as it is written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (field, pa.int64() if field == 'id' else pa.string()) for field in fields
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    try:
+        for batch in batches:
+            records = [serialize(row) for row in batch]
+            columns = [[record[field] for record in records] for field in fields]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+ENCODERS = {
+    'csv': encode_csv,
+    'ndjson': encode_ndjson,
+    'parquet': encode_parquet,
+}
+
+def check_format(export_format):
+    """Fail early (before streaming starts) if a format cannot be produced"""
+    if export_format == 'parquet':
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ExportUnavailable("Parquet export requires pyarrow")
+
+def export_vehicles(statement, export_format, fields, serialize, batch_size=1000):
+    """Generator of encoded bytes for every row of a column statement"""
+    batches = stream_batches(statement, batch_size)
+    try:
+        yield from ENCODERS[export_format](batches, fields, serialize)
+    finally:
+        batches.close()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+SQLite FTS5 full-text index behind the /api/vehicles search parameter
+External-content table over veiculos, kept in sync by triggers. The trigram
+tokenizer indexes every 3-character substring, so a fragment typed anywhere
+in a plate, chassi or SPJ (e.g. a chassi suffix) is an index lookup.
+"""
+
+from database import db
+
+FTS_TABLE = 'veiculos_fts'
+
+# Database column names indexed by the FTS table (same order as BM25_WEIGHTS)
+FTS_COLUMNS = ['placaverdadeira', 'placaostentada', 'modelo', 'spj', 'chassi', 'proprietário']
+
+# Plates and SPJ are what operators usually type, so they outrank free text
+BM25_WEIGHTS = [10.0, 10.0, 2.0, 8.0, 5.0, 1.0]
+
+# Case-insensitive trigrams: a quoted phrase matches wherever it occurs as a substring
+FTS_OPTIONS = "tokenize='trigram'"
+
+# Shortest search the trigram index can answer
+MIN_MATCH_LENGTH = 3
+
+# Characters that make a search a LIKE pattern rather than literal text
+LIKE_WILDCARDS = ('%', '_')
+
+_fts_available = {}
+
+def _column_list(prefix=''):
+    return ', '.join(f'{prefix}"{column}"' for column in FTS_COLUMNS)
+
+def create_statements(options=FTS_OPTIONS):
+    """
+    DDL for the FTS table and its sync triggers (idempotent).
+    Migrations pass the table options of their own schema version.
+    """
+    columns = _column_list()
+    new_values = _column_list('new.')
+    old_values = _column_list('old.')
+
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {columns},
+            content='veiculos',
+            content_rowid='id',
+            {options}
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON veiculos BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON veiculos BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns} ON veiculos BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END""",
+    ]
+
+TRIGGER_NAMES = [f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+
+def bulk_statements(id_query):
+    """
+    SQL to maintain the index set-wise for the veiculos rows whose ids are
+    returned by id_query, for bulk writers that suspend the per-row triggers.
+    Returns (remove, add): run remove before changing the rows, add after.
+    """
+    columns = _column_list()
+    remove = (
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+        f"SELECT 'delete', id, {columns} FROM veiculos WHERE id IN ({id_query})"
+    )
+    add = (
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) "
+        f"SELECT id, {columns} FROM veiculos WHERE id IN ({id_query})"
+    )
+    return remove, add
+
+def create_fts_index(connection, options=FTS_OPTIONS):
+    """Create the FTS table and triggers, then index the existing rows"""
+    for statement in create_statements(options):
+        connection.exec_driver_sql(statement)
+    rebuild_fts_index(connection)
+
+def rebuild_fts_index(connection):
+    """Re-read every row of veiculos into the FTS index"""
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+def fts_available(engine):
+    """Check once per engine whether the FTS table has been created"""
+    key = str(engine.url)
+    if key not in _fts_available:
+        with engine.connect() as connection:
+            found = connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (FTS_TABLE,)
+            ).scalar()
+        _fts_available[key] = bool(found)
+    return _fts_available[key]
+
+def build_match_query(search):
+    """
+    Turn the search text into an FTS5 query matching it as a substring of any
+    indexed column. Returns None when the index can't answer it: text shorter
+    than a trigram, or containing LIKE wildcards, which the search has always
+    honoured.
+    """
+    if len(search) < MIN_MATCH_LENGTH or any(wildcard in search for wildcard in LIKE_WILDCARDS):
+        return None
+    return '"' + search.replace('"', '""') + '"'
+
+def match_subquery(match_query):
+    """Subquery of (id, rank) for rows matching an FTS5 query; lower rank is better"""
+    fts = db.table(FTS_TABLE, db.column('rowid'))
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+
+    # rowid + 0 hides the join column from FTS5's xBestIndex: offered a rowid
+    # constraint, SQLite would loop over an indexed veiculos filter (status,
+    # categories...) and re-run the MATCH per row instead of driving from it
+    return (
+        db.select(
+            (fts.c.rowid + 0).label('id'),
+            db.literal_column(f'bm25({FTS_TABLE}, {weights})').label('rank')
+        )
+        .select_from(fts)
+        .where(db.text(f'{FTS_TABLE} MATCH :fts_query').bindparams(fts_query=match_query))
+        .subquery('fts_matches')
+    )
+
+def match_ids(match_query):
+    """SELECT of the ids of rows matching an FTS5 query, for an IN filter (no ranking)"""
+    fts = db.table(FTS_TABLE, db.column('rowid'))
+    return (
+        db.select(fts.c.rowid)
+        .select_from(fts)
+        .where(db.text(f'{FTS_TABLE} MATCH :fts_query').bindparams(fts_query=match_query))
+    )
+
+if __name__ == "__main__":
+    for sample in ["ABC1234", "fiat uno", "São Paulo", "253168", "a%", "ab"]:
+        print(f"{sample!r} -> {build_match_query(sample)!r}")
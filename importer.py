@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Bulk import of vehicle exports (CSV/XLSX) into the veiculos table
+Reads in chunks, normalizes dates and plates, and upserts on spj/chassi
+with batched executemany inside large transactions
+"""
+
+import csv
+import functools
+import re
+import sqlite3
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+from dates import parse_date_field
+import aggregates
+from fts import FTS_TABLE, TRIGGER_NAMES, bulk_statements, create_statements
+from lookups import LEGACY_COLUMNS, LOOKUP_COLUMNS
+from models import Veiculo
+
+CHUNK_SIZE = 5000
+ROWS_PER_TRANSACTION = 100000
+
+DATE_COLUMNS = {'dataapreensão': 'dataapreensão_dt', 'datamovimentação': 'datamovimentação_dt'}
+PLATE_COLUMNS = {'placaverdadeira', 'placaostentada', 'chassi'}
+
+# foreign key column -> lookup table of the dictionary-encoded columns
+LOOKUP_TABLES = {fk: table for table, fk, _ in LOOKUP_COLUMNS.values()}
+
+def _header_key(name):
+    """Lowercase, accent- and separator-free form used to match file headers"""
+    decomposed = unicodedata.normalize('NFKD', str(name).strip().casefold())
+    return ''.join(ch for ch in decomposed if ch.isalnum())
+
+def importable_columns():
+    """
+    {header key: database column} for every column a file may provide.
+    Both the database names (dataapreensão) and the API names
+    (data_apreensao) are accepted; the dictionary-encoded columns also
+    accept their original TEXT names (status, pátio).
+    """
+    computed = set(DATE_COLUMNS.values()) | {'id'}
+    mapping = {}
+    for attribute in Veiculo.__mapper__.column_attrs:
+        column = attribute.columns[0]
+        if column.name in computed or column.computed is not None:
+            continue
+        mapping[_header_key(column.name)] = column.name
+        mapping[_header_key(attribute.key)] = column.name
+        if column.name in LEGACY_COLUMNS:
+            mapping[_header_key(LEGACY_COLUMNS[column.name])] = column.name
+    return mapping
+
+NON_ALNUM = re.compile(r'[^0-9A-Z]')
+
+def normalize_plate(value):
+    """'abc-1234 ' -> 'ABC1234'"""
+    return NON_ALNUM.sub('', value.upper()) or None
+
+def normalize_key(column, value):
+    """Upsert key form of a stored spj/chassi, as normalize_record() would clean it"""
+    value = str(value).strip() or None
+    if value and column in PLATE_COLUMNS:
+        value = normalize_plate(value)
+    return value
+
+def normalize_date(value):
+    """
+    Return (display text, normalized *_dt text) for a raw date cell.
+    Unparseable values are kept as they are, with no normalized date.
+    """
+    parsed = value if isinstance(value, datetime) else parse_date_field(value)
+    if parsed is None:
+        return value, None
+    if parsed.hour or parsed.minute or parsed.second:
+        display = parsed.strftime('%Y-%m-%d %H:%M:%S')
+    else:
+        display = parsed.strftime('%Y-%m-%d')
+    # Same text layout SQLAlchemy's DateTime type uses, so range filters compare correctly
+    return display, parsed.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+# Exports repeat the same few thousand date strings, so normalize each one once
+_normalize_date_text = functools.lru_cache(maxsize=65536)(normalize_date)
+
+def normalize_record(raw):
+    """Clean one {database column: cell} record in place and add the *_dt columns"""
+    for column, value in raw.items():
+        if value.__class__ is str:
+            raw[column] = value.strip() or None
+        elif value is None or isinstance(value, datetime):
+            continue
+        elif isinstance(value, float) and value.is_integer():
+            raw[column] = str(int(value))  # spreadsheet numbers like 2023.0
+        else:
+            raw[column] = str(value).strip() or None
+
+    for column in PLATE_COLUMNS:
+        value = raw.get(column)
+        if value:
+            raw[column] = normalize_plate(value)
+
+    for column, normalized_column in DATE_COLUMNS.items():
+        if column in raw:
+            value = raw[column]
+            if value is None:
+                raw[normalized_column] = None
+            elif isinstance(value, datetime):
+                raw[column], raw[normalized_column] = normalize_date(value)
+            else:
+                raw[column], raw[normalized_column] = _normalize_date_text(value)
+
+    return raw
+
+def read_csv(path, chunk_size):
+    """Yield (header, rows) chunks from a CSV file, sniffing ',' or ';'"""
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        sample = handle.read(64 * 1024)
+        handle.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.reader(handle, dialect)
+        header = next(reader, [])
+        chunk = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+
+def read_xlsx(path, chunk_size):
+    """Yield (header, rows) chunks from the first sheet of an XLSX file"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("XLSX import requires openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [cell if cell is not None else '' for cell in next(rows, [])]
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+    finally:
+        workbook.close()
+
+READERS = {'.csv': read_csv, '.xlsx': read_xlsx}
+
+class VehicleImporter:
+    """
+    Upserts chunks of records into veiculos over one sqlite3 connection.
+    status/tipo/pátio/circunscrição strings are encoded to their lookup ids,
+    adding values that are not in the lookup tables yet.
+    Inside each transaction the per-row FTS and summary-count triggers are
+    replaced by set-wise maintenance per chunk; they are recreated before every
+    COMMIT, so other connections never see the table without them.
+    """
+
+    def __init__(self, db_path, rows_per_transaction=ROWS_PER_TRANSACTION):
+        self.connection = sqlite3.connect(db_path, isolation_level=None)
+        self.connection.execute("PRAGMA cache_size = -200000")
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS import_ids (id INTEGER PRIMARY KEY)")
+        self.has_fts = self._has_table(FTS_TABLE)
+        self.has_summary = self._has_table(aggregates.SUMMARY_TABLE)
+        self.rows_per_transaction = rows_per_transaction
+        self.rows_in_transaction = 0
+        self.in_transaction = False
+        self.stats = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    def _has_table(self, name):
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def begin(self):
+        # IMMEDIATE takes the write lock up front, so ids and keys read below stay valid
+        self.connection.execute("BEGIN IMMEDIATE")
+        self.in_transaction = True
+        if self.has_fts:
+            for trigger in TRIGGER_NAMES:
+                self.connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        if self.has_summary:
+            for trigger in aggregates.TRIGGER_NAMES:
+                self.connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        self.next_id = (self.connection.execute("SELECT MAX(id) FROM veiculos").fetchone()[0] or 0) + 1
+        # Keyed like the incoming records, so rows stored before normalization still match
+        self.by_spj, self.by_chassi = ({
+            normalize_key(column, value): vehicle_id
+            for value, vehicle_id in self.connection.execute(
+                f"SELECT {column}, id FROM veiculos WHERE {column} IS NOT NULL AND {column} != ''"
+            )
+        } for column in ('spj', 'chassi'))
+        self.lookup_ids = {
+            fk: dict(self.connection.execute(f"SELECT value, id FROM {table}"))
+            for fk, table in LOOKUP_TABLES.items()
+        }
+
+    def commit(self):
+        if self.in_transaction:
+            if self.has_fts:
+                for statement in create_statements():
+                    self.connection.execute(statement)
+            if self.has_summary:
+                for statement in aggregates.create_statements():
+                    self.connection.execute(statement)
+            self.connection.execute("COMMIT")
+            self.in_transaction = False
+            self.rows_in_transaction = 0
+
+    def rollback(self):
+        if self.in_transaction:
+            self.connection.execute("ROLLBACK")
+            self.in_transaction = False
+
+    def close(self):
+        self.connection.close()
+
+    def encode_lookups(self, columns, records):
+        """Replace the strings of the encoded columns by their lookup ids"""
+        for column in columns:
+            if column not in LOOKUP_TABLES:
+                continue
+            ids = self.lookup_ids[column]
+            for record in records:
+                value = record.get(column)
+                if value is None:
+                    continue
+                lookup_id = ids.get(value)
+                if lookup_id is None:
+                    lookup_id = self.connection.execute(
+                        f"INSERT INTO {LOOKUP_TABLES[column]} (value) VALUES (?)", (value,)
+                    ).lastrowid
+                    ids[value] = lookup_id
+                record[column] = lookup_id
+
+    def write_chunk(self, columns, records):
+        """Upsert normalized records sharing the same column list"""
+        if not self.in_transaction:
+            self.begin()
+        self.encode_lookups(columns, records)
+
+        inserts, updates = {}, {}
+        for record in records:
+            spj, chassi = record.get('spj'), record.get('chassi')
+            if not spj and not chassi and not any(record.values()):
+                self.stats['skipped'] += 1
+                continue
+
+            vehicle_id = self.by_spj.get(spj) if spj else None
+            if vehicle_id is None and chassi:
+                vehicle_id = self.by_chassi.get(chassi)
+
+            if vehicle_id is None:
+                vehicle_id = self.next_id
+                self.next_id += 1
+                inserts[vehicle_id] = record
+            elif vehicle_id in inserts:
+                inserts[vehicle_id] = record  # repeated within this chunk: last row wins
+            else:
+                updates[vehicle_id] = record
+
+            if spj:
+                self.by_spj[spj] = vehicle_id
+            if chassi:
+                self.by_chassi[chassi] = vehicle_id
+
+        remove_from_fts, add_to_fts = bulk_statements("SELECT id FROM temp.import_ids")
+        remove_from_summary, add_to_summary = aggregates.bulk_statements("SELECT id FROM temp.import_ids")
+        if self.has_fts or self.has_summary:
+            self.connection.execute("DELETE FROM temp.import_ids")
+            self.connection.executemany(
+                "INSERT INTO temp.import_ids (id) VALUES (?)", ((i,) for i in updates)
+            )
+        if self.has_fts:
+            self.connection.execute(remove_from_fts)
+        if self.has_summary:
+            for statement in remove_from_summary:
+                self.connection.execute(statement)
+
+        quoted = [f'"{column}"' for column in columns]
+        if inserts:
+            self.connection.executemany(
+                f'INSERT INTO veiculos (id, {", ".join(quoted)}) '
+                f'VALUES (?, {", ".join("?" for _ in columns)})',
+                ([vehicle_id] + [record.get(column) for column in columns]
+                 for vehicle_id, record in inserts.items())
+            )
+        if updates:
+            self.connection.executemany(
+                f'UPDATE veiculos SET {", ".join(f"{q} = ?" for q in quoted)} WHERE id = ?',
+                ([record.get(column) for column in columns] + [vehicle_id]
+                 for vehicle_id, record in updates.items())
+            )
+
+        if self.has_fts or self.has_summary:
+            self.connection.executemany(
+                "INSERT INTO temp.import_ids (id) VALUES (?)", ((i,) for i in inserts)
+            )
+        if self.has_fts:
+            self.connection.execute(add_to_fts)
+        if self.has_summary:
+            for statement in add_to_summary:
+                self.connection.execute(statement)
+
+        self.stats['inserted'] += len(inserts)
+        self.stats['updated'] += len(updates)
+        self.rows_in_transaction += len(records)
+        if self.rows_in_transaction >= self.rows_per_transaction:
+            self.commit()
+
+def import_file(path, db_path, chunk_size=CHUNK_SIZE, rows_per_transaction=ROWS_PER_TRANSACTION):
+    """Import a CSV/XLSX export into veiculos and return the row statistics"""
+    path = Path(path)
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported file type: {path.suffix} (expected .csv or .xlsx)")
+
+    known_columns = importable_columns()
+    importer = VehicleImporter(db_path, rows_per_transaction)
+    started = time.perf_counter()
+    total_rows = 0
+
+    try:
+        for header, rows in reader(path, chunk_size):
+            positions = [
+                (index, known_columns[_header_key(name)])
+                for index, name in enumerate(header)
+                if _header_key(name) in known_columns
+            ]
+            if not positions:
+                raise ValueError(f"No known vehicle columns in header: {header}")
+
+            records = [
+                normalize_record({column: row[index] if index < len(row) else None
+                                  for index, column in positions})
+                for row in rows
+            ]
+            columns = list(records[0].keys())
+            importer.write_chunk(columns, records)
+
+            total_rows += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"  {total_rows} rows read ({total_rows / elapsed:,.0f} rows/s)")
+
+        importer.commit()
+    except Exception:
+        importer.rollback()
+        raise
+    finally:
+        importer.close()
+
+    elapsed = time.perf_counter() - started
+    stats = dict(importer.stats, rows=total_rows, seconds=elapsed,
+                 rows_per_second=total_rows / elapsed if elapsed else 0)
+    return stats
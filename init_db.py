@@ -14,6 +14,10 @@ sys.path.insert(0, str(Path(__file__).parent))
 from app import app
 from database import db
 from models import Veiculo, Ocorrencia, HistoricoMovimentacao, create_sample_data
+from migrations import run_migrations
+from fts import rebuild_fts_index
+from aggregates import rebuild_summary_tables
+from importer import import_file
 
 def init_database(add_sample_data=True):
     """Initialize the database with tables and optionally sample data"""
@@ -27,6 +31,9 @@ def init_database(add_sample_data=True):
             db.create_all()
             print("✅ Tables created successfully!")
             
+            # Bring existing tables up to the current schema
+            run_migrations()
+            
             # Check if we already have data
             vehicle_count = Veiculo.query.count()
             
@@ -60,6 +67,7 @@ def reset_database():
             # Create all tables
             print("📊 Creating new tables...")
             db.create_all()
+            run_migrations(force=True)
             
             # Add sample data
             print("📝 Adding sample data...")
@@ -73,12 +81,62 @@ def reset_database():
             print(f"❌ Error resetting database: {e}")
             sys.exit(1)
 
+def rebuild_search_index():
+    """Rebuild the FTS5 search index from the veiculos table"""
+    
+    print("🔎 Rebuilding full-text search index...")
+    
+    with app.app_context():
+        try:
+            with db.engine.begin() as connection:
+                rebuild_fts_index(connection)
+            print("✅ Search index rebuilt!")
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding search index: {e}")
+            sys.exit(1)
+
+def rebuild_aggregates():
+    """Recount the trigger-maintained summary tables from the veiculos table"""
+    
+    print("🧮 Rebuilding summary counts...")
+    
+    with app.app_context():
+        try:
+            with db.engine.begin() as connection:
+                rebuild_summary_tables(connection)
+            print("✅ Summary counts rebuilt!")
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding summary counts: {e}")
+            sys.exit(1)
+
+def import_vehicles(file_path):
+    """Bulk import a CSV/XLSX export, upserting on spj/chassi"""
+    
+    print(f"📥 Importing vehicles from {file_path}...")
+    
+    with app.app_context():
+        try:
+            run_migrations()
+            stats = import_file(file_path, db.engine.url.database)
+            
+            print(f"✅ Import complete: {stats['rows']} rows in {stats['seconds']:.1f}s "
+                  f"({stats['rows_per_second']:,.0f} rows/s)")
+            print(f"  - Inserted: {stats['inserted']}")
+            print(f"  - Updated: {stats['updated']}")
+            print(f"  - Skipped (empty): {stats['skipped']}")
+            
+        except Exception as e:
+            print(f"❌ Error importing vehicles: {e}")
+            sys.exit(1)
+
 def check_database():
     """Check database status and content"""
     
     print("🔍 Checking database status...")
     
-    db_path = "veiculosapreendidos.db"
+    db_path = app.config['DATABASE_PATH']
     
     if not Path(db_path).exists():
         print(f"❌ Database file not found: {db_path}")
@@ -87,7 +145,7 @@ def check_database():
     with app.app_context():
         try:
             # Check tables exist
-            tables = db.engine.table_names()
+            tables = db.inspect(db.engine).get_table_names()
             print(f"📊 Found {len(tables)} tables: {', '.join(tables)}")
             
             # Check data
@@ -122,11 +180,26 @@ if __name__ == "__main__":
     parser.add_argument("--reset", action="store_true", help="Reset database (delete all data)")
     parser.add_argument("--check", action="store_true", help="Check database status")
     parser.add_argument("--no-sample", action="store_true", help="Don't add sample data")
+    parser.add_argument("--migrate", action="store_true", help="Apply pending schema migrations")
+    parser.add_argument("--rebuild-fts", action="store_true", help="Rebuild the full-text search index")
+    parser.add_argument("--rebuild-aggregates", action="store_true",
+                        help="Recount the summary tables behind the statistics endpoints")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="Bulk import vehicles from a CSV or XLSX export")
     
     args = parser.parse_args()
     
     if args.check:
         check_database()
+    elif args.migrate:
+        with app.app_context():
+            run_migrations()
+    elif args.rebuild_fts:
+        rebuild_search_index()
+    elif args.rebuild_aggregates:
+        rebuild_aggregates()
+    elif args.import_file:
+        import_vehicles(args.import_file)
     elif args.reset:
         confirmation = input("⚠️  This will delete ALL data. Type 'yes' to continue: ")
         if confirmation.lower() == 'yes':
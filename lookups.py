@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Dictionary-encoded status, tipo, pátio and circunscrição
+Each distinct value is stored once in a small lookup table and veiculos keeps
+an integer foreign key. The id <-> value dictionaries are cached in-process,
+reloaded after database writes (ids are never reused), and used to serialize
+rows and to turn filter values into integer ids. The dictionaries only ever
+hold committed values and never take the (single) writer connection away from
+the session. Each lookup row also keeps the rank of its value in sort order,
+maintained by a trigger on insert, so sorting by an encoded attribute is a
+join on an integer column.
+"""
+
+import threading
+from contextlib import nullcontext
+
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from database import db, data_version, read_engine
+
+# attribute -> (lookup table, foreign key column in veiculos, original TEXT column)
+LOOKUP_COLUMNS = {
+    'status': ('veiculos_status', 'status_id', 'status'),
+    'tipo': ('veiculos_tipo', 'tipo_id', 'tipo'),
+    'patio': ('veiculos_patio', 'patio_id', 'pátio'),
+    'circunscricao': ('veiculos_circunscricao', 'circunscricao_id', 'circunscrição'),
+}
+
+# foreign key column -> original TEXT column, for importers and legacy schemas
+LEGACY_COLUMNS = {fk: legacy for _, fk, legacy in LOOKUP_COLUMNS.values()}
+
+LOOKUP_TABLES = {
+    attribute: db.Table(
+        table_name,
+        db.Column('id', db.Integer, primary_key=True),
+        db.Column('value', db.String(200), nullable=False, unique=True),
+        db.Column('sort_rank', db.Integer, index=True),
+    )
+    for attribute, (table_name, _, _) in LOOKUP_COLUMNS.items()
+}
+
+class LookupCache:
+    """In-process id <-> value dictionaries of the lookup tables"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.values = {attribute: {} for attribute in LOOKUP_COLUMNS}
+        self.ids = {attribute: {} for attribute in LOOKUP_COLUMNS}
+        self.in_value_order = {attribute: False for attribute in LOOKUP_COLUMNS}
+
+    def _committed_connection(self):
+        """
+        A connection that sees only committed lookup values, or None when there
+        is none to be had: without a read pool the writer is the only
+        connection, and once the session has written it holds uncommitted rows.
+        """
+        engine = read_engine()
+        if engine is not db.engine:
+            return engine.connect()
+        if db.session.info.get('has_writes'):
+            return None
+        return nullcontext(db.session.connection())
+
+    def _load(self, connection):
+        values = {}
+        in_value_order = {}
+        with connection as opened:
+            for attribute, table in LOOKUP_TABLES.items():
+                rows = opened.execute(
+                    db.select(table.c.id, table.c.value, table.c.sort_rank).order_by(table.c.id)
+                ).all()
+                values[attribute] = {lookup_id: value for lookup_id, value, _ in rows}
+                # Migrations number the values alphabetically; later inserts may break that
+                ranks = [sort_rank for _, _, sort_rank in rows]
+                in_value_order[attribute] = ranks == sorted(ranks)
+        self.values = values
+        self.in_value_order = in_value_order
+        self.ids = {attribute: {value: lookup_id for lookup_id, value in mapping.items()}
+                    for attribute, mapping in values.items()}
+
+    def refresh(self, force=False):
+        """Reload the dictionaries if the database changed since the last load"""
+        version = data_version()
+        if force or version != self.version:
+            connection = self._committed_connection()
+            if connection is None:
+                # Retried on the next call; values() and id_for() ask the session meanwhile
+                return
+            with self.lock:
+                self._load(connection)
+                self.version = version
+
+    def value(self, attribute, lookup_id):
+        """String value of an id (None for NULL)"""
+        if lookup_id is None:
+            return None
+        value = self.values[attribute].get(lookup_id)
+        if value is None:
+            # Added after the last load
+            self.refresh(force=True)
+            value = self.values[attribute].get(lookup_id)
+        if value is None:
+            # Added by the current, uncommitted transaction (never cached: it may roll back)
+            table = LOOKUP_TABLES[attribute]
+            value = db.session.execute(
+                db.select(table.c.value).where(table.c.id == lookup_id)
+            ).scalar()
+        return value
+
+    def id_for(self, attribute, value, create=False):
+        """
+        Id of a value, or None if it is not in the lookup table.
+        create=True inserts it first through the current session.
+        """
+        if value is None:
+            return None
+        self.refresh()
+        lookup_id = self.ids[attribute].get(value)
+        if lookup_id is None:
+            # Not loaded yet, or new in this session's transaction
+            table = LOOKUP_TABLES[attribute]
+            select_id = db.select(table.c.id).where(table.c.value == value)
+            lookup_id = db.session.execute(select_id).scalar()
+            if lookup_id is None and create:
+                db.session.execute(table.insert().prefix_with('OR IGNORE').values(value=value))
+                lookup_id = db.session.execute(select_id).scalar()
+        return lookup_id
+
+    def ids_where(self, attribute, predicate):
+        """Ids of the values for which predicate(value) is true"""
+        self.refresh()
+        return [lookup_id for lookup_id, value in self.values[attribute].items() if predicate(value)]
+
+lookup_cache = LookupCache()
+
+def foreign_key(attribute):
+    """The veiculos integer column of an encoded attribute"""
+    from models import Veiculo
+    return getattr(Veiculo, LOOKUP_COLUMNS[attribute][1])
+
+def equals(attribute, value):
+    """Filter condition attribute == value, as an integer comparison"""
+    lookup_id = lookup_cache.id_for(attribute, value)
+    return foreign_key(attribute) == lookup_id if lookup_id is not None else db.false()
+
+def matching(attribute, predicate):
+    """Filter condition for the rows whose value satisfies predicate(value)"""
+    return foreign_key(attribute).in_(lookup_cache.ids_where(attribute, predicate))
+
+def sort_by(query, attribute):
+    """
+    Query and ORDER BY column sorting by an encoded attribute: the indexed
+    integer column while the ids follow the value order, otherwise the rank
+    of the value in its lookup table, joined in.
+    """
+    lookup_cache.refresh()
+    if lookup_cache.in_value_order[attribute]:
+        return query, foreign_key(attribute)
+    table = LOOKUP_TABLES[attribute]
+    return query.outerjoin(table, table.c.id == foreign_key(attribute)), table.c.sort_rank
+
+def lookup_property(attribute):
+    """
+    Mapped-class attribute exposing an encoded column as its string value:
+    instances read and write strings, queries get a correlated subquery
+    (filters should go through equals()/matching(), sorting through sort_by()).
+    """
+    table = LOOKUP_TABLES[attribute]
+    fk = LOOKUP_COLUMNS[attribute][1]
+
+    def fget(self):
+        return lookup_cache.value(attribute, getattr(self, fk))
+
+    def fset(self, value):
+        setattr(self, fk, lookup_cache.id_for(attribute, value, create=True))
+
+    def expr(cls):
+        return (
+            db.select(table.c.value)
+            .where(table.c.id == getattr(cls, fk))
+            .scalar_subquery()
+            .label(attribute)
+        )
+
+    return hybrid_property(fget, fset, expr=expr)
+
+def create_lookup_tables(connection):
+    """Create the lookup tables if they don't exist"""
+    for table in LOOKUP_TABLES.values():
+        table.create(connection, checkfirst=True)
+
+def rank_statements(table_name):
+    """
+    DDL for the trigger keeping sort_rank of a lookup table in value order
+    (idempotent). Values are only ever inserted, so an insert shifts the
+    ranks after the new value and takes the gap.
+    """
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table_name}_rank_ai AFTER INSERT ON {table_name} BEGIN
+            UPDATE {table_name} SET sort_rank = sort_rank + 1 WHERE value > new.value;
+            UPDATE {table_name} SET sort_rank = (
+                SELECT count(*) FROM {table_name} WHERE value < new.value
+            ) WHERE id = new.id;
+        END""",
+    ]
+
+def create_rank_triggers(connection):
+    """Number the existing values in sort order and install the rank triggers"""
+    for table_name, _, _ in LOOKUP_COLUMNS.values():
+        connection.exec_driver_sql(
+            f'UPDATE {table_name} SET sort_rank = '
+            f'(SELECT count(*) FROM {table_name} AS earlier WHERE earlier.value < {table_name}.value)'
+        )
+        for statement in rank_statements(table_name):
+            connection.exec_driver_sql(statement)
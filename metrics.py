@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Per-request SQL and timing instrumentation
+SQL is timed with SQLAlchemy cursor events, serialization with timed() blocks
+and JSON encoding through the app's JSON provider. Each response gets a
+Server-Timing header and the numbers are aggregated into Prometheus
+histograms served by /metrics (per process: every worker reports its own).
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from database import db
+
+# Histogram upper bounds (Prometheus "le" labels)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label_values, value):
+        counts, totals = self.series.setdefault(label_values, ([0] * len(self.buckets), [0, 0.0]))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        totals[0] += 1
+        totals[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, (count, total)) in sorted(self.series.items()):
+            labels = _format_labels(self.labels, label_values)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{{{_format_labels(self.labels, label_values)}}} {value}')
+        return lines
+
+def _format_labels(names, values):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+_lock = threading.Lock()
+
+ENDPOINT_LABELS = ('endpoint', 'method')
+
+REQUESTS = Counter('http_requests_total', 'Requests handled, by endpoint and status',
+                   ('endpoint', 'method', 'status'))
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Time spent in the view and hooks',
+                             ENDPOINT_LABELS, DURATION_BUCKETS)
+SQL_DURATION = Histogram('db_query_duration_seconds_per_request', 'SQL execution time per request',
+                         ENDPOINT_LABELS, DURATION_BUCKETS)
+SQL_QUERIES = Histogram('db_queries_per_request', 'SQL statements executed per request',
+                        ENDPOINT_LABELS, QUERY_COUNT_BUCKETS)
+SERIALIZE_DURATION = Histogram('serialization_duration_seconds_per_request',
+                               'Time turning rows/objects into dicts per request',
+                               ENDPOINT_LABELS, DURATION_BUCKETS)
+JSON_DURATION = Histogram('json_encode_duration_seconds_per_request', 'JSON encoding time per request',
+                          ENDPOINT_LABELS, DURATION_BUCKETS)
+
+METRICS = [REQUESTS, REQUEST_DURATION, SQL_DURATION, SQL_QUERIES, SERIALIZE_DURATION, JSON_DURATION]
+
+def _request_timings():
+    """The timings dict of the current request, or None outside a request"""
+    if not has_request_context():
+        return None
+    return g.get('_timings')
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to a phase of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _request_timings()
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Default JSON provider that records encoding time in the 'json' phase"""
+
+    def dumps(self, obj, **kwargs):
+        with timed('json'):
+            return super().dumps(obj, **kwargs)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _request_timings()
+    if timings is not None:
+        timings['sql'] = timings.get('sql', 0.0) + time.perf_counter() - context._query_started
+        timings['queries'] = timings.get('queries', 0) + 1
+
+def _before_request():
+    g._timings = {'started': time.perf_counter()}
+
+def _after_request(response):
+    timings = g.pop('_timings', None)
+    if timings is None:
+        return response
+
+    total = time.perf_counter() - timings['started']
+    endpoint = request.endpoint or 'unmatched'
+    labels = (endpoint, request.method)
+
+    with _lock:
+        REQUESTS.inc((endpoint, request.method, str(response.status_code)))
+        REQUEST_DURATION.observe(labels, total)
+        SQL_DURATION.observe(labels, timings.get('sql', 0.0))
+        SQL_QUERIES.observe(labels, timings.get('queries', 0))
+        SERIALIZE_DURATION.observe(labels, timings.get('serialize', 0.0))
+        JSON_DURATION.observe(labels, timings.get('json', 0.0))
+
+    if response.headers.get('Server-Timing') is None:
+        entries = [f'sql;dur={timings.get("sql", 0.0) * 1000:.2f};desc="{timings.get("queries", 0)} queries"']
+        entries += [f'{phase};dur={timings.get(phase, 0.0) * 1000:.2f}' for phase in ('serialize', 'json')]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+
+    return response
+
+def init_metrics(app):
+    """Install the request hooks, the JSON provider and the SQL cursor events"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            db.event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            db.event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        lines = []
+        for metric in METRICS:
+            lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
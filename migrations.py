@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Schema migrations for veiculosapreendidos.db
+Each migration runs once, in order; progress is tracked in PRAGMA user_version
+"""
+
+import os
+
+from aggregates import TRIGGER_NAMES as SUMMARY_TRIGGERS, create_summary_tables
+from database import db
+from dates import parse_date_field
+from fts import FTS_TABLE, TRIGGER_NAMES as FTS_TRIGGERS, create_fts_index
+from lookups import LOOKUP_COLUMNS, create_lookup_tables, create_rank_triggers
+from models import Veiculo
+
+BACKFILL_BATCH_SIZE = 5000
+
+# The TEXT columns migrations 1, 3 and 4 were written against. Migration 5
+# moves them into lookup tables, so schemas created after it don't have them.
+LEGACY_TEXT_COLUMNS = {column for _, _, column in LOOKUP_COLUMNS.values()}
+
+# FTS5 table options as released in migration 2 (word tokens, prefix indexes)
+FTS_V2_OPTIONS = "tokenize='unicode61 remove_diacritics 2',\n            prefix='2 3 4'"
+
+# Summary dimensions as released in migration 3 (counted from the TEXT columns)
+SUMMARY_V3_DIMENSIONS = {
+    'status': '{row}"status"',
+    'tipo': '{row}"tipo"',
+    'patio': '{row}"pátio"',
+    'circunscricao': '{row}"circunscrição"',
+    'month': "strftime('%Y-%m', {row}\"dataapreensão_dt\")",
+}
+SUMMARY_V3_COLUMNS = {
+    'status': 'status',
+    'tipo': 'tipo',
+    'patio': 'pátio',
+    'circunscricao': 'circunscrição',
+    'month': 'dataapreensão_dt',
+}
+
+# Generated filter category columns as released in migration 4
+CATEGORY_V4_COLUMNS = {
+    'patio_categoria': """CASE "pátio" WHEN '16º DP' THEN '16º DP' WHEN '17º DP' THEN '17º DP' """
+                       """WHEN '35º DP' THEN '35º DP' WHEN 'JDN - Atibaia' THEN 'JDN - Atibaia' """
+                       """WHEN '-' THEN '-' ELSE CASE WHEN "pátio" IS NOT NULL THEN 'Outros' END END""",
+    'circunscricao_categoria': """CASE "circunscrição" WHEN '16º DP' THEN '16º DP' """
+                               """WHEN '17º DP' THEN '17º DP' WHEN '35º DP' THEN '35º DP' """
+                               """ELSE CASE WHEN "circunscrição" IS NOT NULL THEN 'Outros' END END""",
+    'tipo_categoria': """CASE "tipo" WHEN 'MOTO' THEN 'Moto' WHEN 'CARRO' THEN 'Carro' """
+                      """ELSE CASE WHEN "tipo" IS NOT NULL THEN 'Outros' END END""",
+}
+
+def _table_columns(connection, table_name):
+    """Return the column names currently present in a table"""
+    # table_xinfo also lists generated columns, which table_info hides
+    rows = connection.exec_driver_sql(f'PRAGMA table_xinfo("{table_name}")').fetchall()
+    return {row[1] for row in rows}
+
+def _add_column(connection, table_name, column_name, column_type):
+    """ALTER TABLE ADD COLUMN, skipped if the column already exists"""
+    if column_name not in _table_columns(connection, table_name):
+        connection.exec_driver_sql(
+            f'ALTER TABLE "{table_name}" ADD COLUMN "{column_name}" {column_type}'
+        )
+
+def _create_index(connection, table_name, column_name):
+    """CREATE INDEX ix_<table>_<column>, named and quoted the way SQLAlchemy declares it"""
+    def quote(name):
+        return name if name.isascii() and name.isidentifier() else f'"{name}"'
+    connection.exec_driver_sql(
+        f'CREATE INDEX IF NOT EXISTS {quote(f"ix_{table_name}_{column_name}")} '
+        f'ON {quote(table_name)} ({quote(column_name)})'
+    )
+
+def _create_model_indexes(connection):
+    """Create every index declared on Veiculo whose columns exist in the live table"""
+    existing = _table_columns(connection, Veiculo.__tablename__)
+    for index in Veiculo.__table__.indexes:
+        if all(column.name in existing for column in index.columns):
+            index.create(connection, checkfirst=True)
+
+def migrate_normalized_dates(connection):
+    """Add, backfill and index the normalized seizure/movement date columns"""
+    _add_column(connection, 'veiculos', 'dataapreensão_dt', 'DATETIME')
+    _add_column(connection, 'veiculos', 'datamovimentação_dt', 'DATETIME')
+
+    update = (
+        db.update(Veiculo.__table__)
+        .where(Veiculo.__table__.c.id == db.bindparam('b_id'))
+        .values({
+            Veiculo.__table__.c['dataapreensão_dt']: db.bindparam('b_apreensao'),
+            Veiculo.__table__.c['datamovimentação_dt']: db.bindparam('b_movimentacao'),
+        })
+    )
+
+    rows = connection.execute(
+        db.select(Veiculo.id, Veiculo.data_apreensao, Veiculo.ultima_movimentacao)
+    ).all()
+
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        batch = [
+            {
+                'b_id': row[0],
+                'b_apreensao': parse_date_field(row[1]),
+                'b_movimentacao': parse_date_field(row[2]),
+            }
+            for row in rows[start:start + BACKFILL_BATCH_SIZE]
+        ]
+        connection.execute(update, batch)
+
+    print(f"  Backfilled normalized dates for {len(rows)} vehicles")
+    _create_model_indexes(connection)
+    # Declared on the model when this migration was released; migration 5 drops them
+    existing = _table_columns(connection, 'veiculos')
+    for column in sorted(LEGACY_TEXT_COLUMNS & existing):
+        _create_index(connection, 'veiculos', column)
+
+def migrate_fts_index(connection):
+    """Create the FTS5 search index and its sync triggers"""
+    create_fts_index(connection, FTS_V2_OPTIONS)
+
+def _has_legacy_text_columns(connection):
+    return LEGACY_TEXT_COLUMNS <= _table_columns(connection, 'veiculos')
+
+def migrate_summary_tables(connection):
+    """Create the trigger-maintained summary counts"""
+    if not _has_legacy_text_columns(connection):
+        # Created after migration 5, which builds the counts over the lookup ids
+        return
+    create_summary_tables(connection, SUMMARY_V3_DIMENSIONS, SUMMARY_V3_COLUMNS)
+
+def migrate_category_columns(connection):
+    """Add and index the generated pátio/circunscrição/tipo category columns"""
+    if not _has_legacy_text_columns(connection):
+        # Created after migration 5, which replaces these columns by lookup ids
+        return
+    for column, expression in CATEGORY_V4_COLUMNS.items():
+        _add_column(connection, 'veiculos', column,
+                    f'VARCHAR(50) GENERATED ALWAYS AS ({expression}) VIRTUAL')
+        _create_index(connection, 'veiculos', column)
+    _create_model_indexes(connection)
+
+def _drop_category_columns(connection):
+    """Drop the generated category columns of migration 4 and their indexes"""
+    columns = [column for column in CATEGORY_V4_COLUMNS if column in _table_columns(connection, 'veiculos')]
+    _drop_indexes_on(connection, 'veiculos', columns)
+    for column in columns:
+        connection.exec_driver_sql(f'ALTER TABLE veiculos DROP COLUMN "{column}"')
+
+def _drop_indexes_on(connection, table_name, column_names):
+    """Drop the indexes of a table that cover any of the given columns"""
+    for index in connection.exec_driver_sql(f'PRAGMA index_list("{table_name}")').fetchall():
+        index_name, origin = index[1], index[3]
+        if origin != 'c':
+            continue
+        columns = {row[2] for row in connection.exec_driver_sql(f'PRAGMA index_info("{index_name}")')}
+        if columns & set(column_names):
+            connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{index_name}"')
+
+def migrate_lookup_columns(connection):
+    """
+    Move status/tipo/pátio/circunscrição into lookup tables referenced by
+    integer ids, replacing the generated category columns of migration 4 and
+    recounting the summary of migration 3 over the ids
+    """
+    create_lookup_tables(connection)
+    for trigger in SUMMARY_TRIGGERS:
+        connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS "{trigger}"')
+    # They read the TEXT columns, and SQLite refuses to drop indexed columns
+    _drop_category_columns(connection)
+
+    existing = _table_columns(connection, 'veiculos')
+    legacy = [(table, fk, column) for table, fk, column in LOOKUP_COLUMNS.values() if column in existing]
+    if legacy:
+        for table, fk, column in legacy:
+            connection.exec_driver_sql(
+                f'INSERT OR IGNORE INTO {table} (value) SELECT DISTINCT "{column}" FROM veiculos '
+                f'WHERE "{column}" IS NOT NULL ORDER BY 1'
+            )
+            _add_column(connection, 'veiculos', fk, f'INTEGER REFERENCES {table}(id)')
+
+        assignments = ', '.join(
+            f'"{fk}" = (SELECT id FROM {table} WHERE value = veiculos."{column}")'
+            for table, fk, column in legacy
+        )
+        connection.exec_driver_sql(f'UPDATE veiculos SET {assignments}')
+
+        dropped = [column for _, _, column in legacy]
+        _drop_indexes_on(connection, 'veiculos', dropped)
+        for column in dropped:
+            connection.exec_driver_sql(f'ALTER TABLE veiculos DROP COLUMN "{column}"')
+        print(f"  Encoded {', '.join(column for _, _, column in legacy)} as integer lookups")
+
+    _create_model_indexes(connection)
+    create_summary_tables(connection)
+
+def migrate_trigram_fts_index(connection):
+    """Rebuild the FTS5 index with the trigram tokenizer, so fragments match anywhere"""
+    for trigger in FTS_TRIGGERS:
+        connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS "{trigger}"')
+    connection.exec_driver_sql(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    create_fts_index(connection)
+
+def migrate_lookup_sort_rank(connection):
+    """Rank the lookup values in sort order, so sorting by them is a join instead of a subquery"""
+    for table_name, _, _ in LOOKUP_COLUMNS.values():
+        _add_column(connection, table_name, 'sort_rank', 'INTEGER')
+        _create_index(connection, table_name, 'sort_rank')
+    create_rank_triggers(connection)
+
+# (version, description, function) - append only, never reorder
+MIGRATIONS = [
+    (1, "Normalized, indexed seizure and movement dates", migrate_normalized_dates),
+    (2, "FTS5 full-text search index", migrate_fts_index),
+    (3, "Trigger-maintained summary counts", migrate_summary_tables),
+    (4, "Indexed filter category columns", migrate_category_columns),
+    (5, "Dictionary-encoded status/tipo/pátio/circunscrição", migrate_lookup_columns),
+    (6, "Trigram FTS5 index for substring search", migrate_trigram_fts_index),
+    (7, "Sort ranks for the lookup values", migrate_lookup_sort_rank),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(connection):
+    """Return the schema version stored in the database header"""
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+def run_migrations(force=False):
+    """
+    Create missing tables and apply all pending migrations. Must be called
+    inside an app context. force=True re-applies every migration, e.g. after tables were recreated.
+    """
+    with db.engine.begin() as connection:
+        # Take the write lock before reading the version, so processes starting
+        # together migrate once: the others wait, then find the schema current
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        version = 0 if force else get_schema_version(connection)
+        pending = [m for m in MIGRATIONS if m[0] > version]
+
+        if not pending:
+            print(f"ℹ️  Schema is up to date (version {version})")
+            return version
+
+        db.metadata.create_all(connection)
+        for target_version, description, migrate in pending:
+            print(f"🔄 Migration {target_version}: {description}")
+            migrate(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {target_version}")
+
+        print(f"✅ Schema migrated to version {LATEST_VERSION}")
+        return LATEST_VERSION
+
+def ensure_schema(app, migrate=True):
+    """
+    Make sure the app's database is at LATEST_VERSION before it serves: apply
+    pending migrations, or with migrate=False report
+    the stale schema. Returns whether the schema is current. An up-to-date
+    database costs a single PRAGMA read; a missing one is left for init_db.py.
+    """
+    if not os.path.exists(app.config['DATABASE_PATH']):
+        print(f"⚠️  Database not found: {app.config['DATABASE_PATH']}")
+        print("💡 Initialize it with: python init_db.py")
+        return False
+    
+    with app.app_context():
+        with db.engine.connect() as connection:
+            version = get_schema_version(connection)
+        if version >= LATEST_VERSION:
+            return True
+        
+        if not migrate:
+            print(f"❌ Database schema is at version {version}, this code needs version {LATEST_VERSION}")
+            print("💡 Apply the migrations with: python init_db.py --migrate")
+            return False
+        
+        run_migrations()
+        return True
+
+if __name__ == "__main__":
+    from app import app
+
+    with app.app_context():
+        run_migrations()
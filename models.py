@@ -4,7 +4,11 @@ Fixed SQLAlchemy Models - Removed the non-existent pessoa_relacionada field
 """
 
 from datetime import datetime
+import functools
+
 from database import db
+from dates import parse_date_field
+from lookups import LOOKUP_COLUMNS, lookup_cache, lookup_property
 
 class Veiculo(db.Model):
     """Main vehicle table with all vehicle information"""
@@ -19,23 +23,37 @@ class Veiculo(db.Model):
     natureza = db.Column('natureza', db.String(200))
     procedimento = db.Column('procedimento', db.String(200))
     equipe = db.Column('equipe', db.String(200))
-    status = db.Column('status', db.String(50), index=True)
+    # Low-cardinality columns are dictionary-encoded (see lookups.py): the row
+    # holds an integer id, the attribute of the same name reads/writes the string
+    status_id = db.Column('status_id', db.Integer, db.ForeignKey('veiculos_status.id'), index=True)
+    status = lookup_property('status')
     chave = db.Column('chave', db.String(200))
-    tipo = db.Column('tipo', db.String(50), index=True)
+    tipo_id = db.Column('tipo_id', db.Integer, db.ForeignKey('veiculos_tipo.id'), index=True)
+    tipo = lookup_property('tipo')
     modelo = db.Column('modelo', db.String(200), index=True)
     cor = db.Column('cor', db.String(50))
     chassi = db.Column('chassi', db.String(50), index=True)
     afis = db.Column('afis', db.String(100))
-    obs1 = db.Column('obs1', db.Text)
-    obs2 = db.Column('obs2', db.Text)
+    # Long free-text columns are only loaded when a full record is needed
+    obs1 = db.deferred(db.Column('obs1', db.Text), group='observacoes')
+    obs2 = db.deferred(db.Column('obs2', db.Text), group='observacoes')
     
     # Portuguese named fields (using exact database column names)
     ano = db.Column('anospj', db.String(50))  # Your database has this as TEXT
     num_procedimento = db.Column('procedimentonumero', db.String(100))
-    circunscricao = db.Column('circunscrição', db.String(50), index=True)
-    patio = db.Column('pátio', db.String(200), index=True)
+    circunscricao_id = db.Column('circunscricao_id', db.Integer,
+                                 db.ForeignKey('veiculos_circunscricao.id'), index=True)
+    circunscricao = lookup_property('circunscricao')
+    patio_id = db.Column('patio_id', db.Integer, db.ForeignKey('veiculos_patio.id'), index=True)
+    patio = lookup_property('patio')
     data_apreensao = db.Column('dataapreensão', db.String(50))  # TEXT in database
     ultima_movimentacao = db.Column('datamovimentação', db.String(50))  # TEXT in database
+    
+    # Normalized copies of the TEXT dates above, kept in sync by _sync_normalized_dates
+    # and backfilled by migrations.py so date filters run as indexed range predicates
+    data_apreensao_dt = db.Column('dataapreensão_dt', db.DateTime, index=True)
+    ultima_movimentacao_dt = db.Column('datamovimentação_dt', db.DateTime, index=True)
+    
     ano_fabricacao = db.Column('anofabricação', db.String(50))  # TEXT in database
     ano_modelo = db.Column('anomodelo', db.String(50))  # TEXT in database
     placa_original = db.Column('placaverdadeira', db.String(20), index=True)
@@ -53,43 +71,117 @@ class Veiculo(db.Model):
     def __repr__(self):
         return f'<Veiculo {self.spj} - {self.placa_original}>'
     
-    def to_dict(self, include_relations=False):
-        """Convert vehicle object to dictionary for JSON serialization"""
+    def to_dict(self, include_relations=False, fields=None):
+        """
+        Convert vehicle object to dictionary for JSON serialization.
+        fields limits the output to a subset of API_FIELDS (see parse_fields).
+        """
         
-        return {
-            'id': self.id,
-            'spj': self.spj or '',
-            'ano': self.ano or '',
-            'natureza': self.natureza or '',
-            'procedimento': self.procedimento or '',
-            'equipe': self.equipe or '',
-            'num_procedimento': self.num_procedimento or '',
-            'status': self.status or '',
-            'status_class': self.status.lower().replace(' ', '_') if self.status else '',
-            'chave': self.chave or '',
-            'circunscricao': self.circunscricao or '',
-            'patio': self.patio or '',
-            'data_apreensao': self.data_apreensao or '',
-            'ultima_movimentacao': self.ultima_movimentacao or '',
-            'tipo': self.tipo or '',
-            'modelo': self.modelo or '',
-            'cor': self.cor or '',
-            'ano_fabricacao': self.ano_fabricacao or '',
-            'ano_modelo': self.ano_modelo or '',
-            'placa_original': self.placa_original or '',
-            'placa_ostentada': self.placa_ostentada or '',
-            'chassi': self.chassi or '',
-            'proprietario': self.proprietario or '',
-            'pessoa_relacionada': '',  # Return empty string since field doesn't exist
-            'pericia': self.pericia or '',
-            'protocolo': self.protocolo or '',
-            'status_pericia': self.status_pericia or '',
-            'numero_laudo': self.numero_laudo or '',
-            'resultado_laudo': self.resultado_laudo or '',
-            'afis': self.afis or '',
-            'obs1': self.obs1 or '',
-            'obs2': self.obs2 or ''
-        }
+        data = {}
+        for field in (fields or API_FIELDS):
+            if field == 'id':
+                data['id'] = self.id
+            elif field == 'status_class':
+                data['status_class'] = self.status.lower().replace(' ', '_') if self.status else ''
+            elif field == 'pessoa_relacionada':
+                data['pessoa_relacionada'] = ''  # Return empty string since field doesn't exist
+            else:
+                data[field] = getattr(self, field) or ''
+        return data
+
+# Keys returned by Veiculo.to_dict(). Except for the two derived keys below,
+# each one is also the name of the mapped attribute it is read from.
+API_FIELDS = [
+    'id', 'spj', 'ano', 'natureza', 'procedimento', 'equipe', 'num_procedimento',
+    'status', 'status_class', 'chave', 'circunscricao', 'patio', 'data_apreensao',
+    'ultima_movimentacao', 'tipo', 'modelo', 'cor', 'ano_fabricacao', 'ano_modelo',
+    'placa_original', 'placa_ostentada', 'chassi', 'proprietario', 'pessoa_relacionada',
+    'pericia', 'protocolo', 'status_pericia', 'numero_laudo', 'resultado_laudo',
+    'afis', 'obs1', 'obs2'
+]
+
+# Derived keys -> attribute they are computed from (None: constant)
+DERIVED_FIELDS = {'status_class': 'status', 'pessoa_relacionada': None}
+
+def parse_fields(fields_param):
+    """
+    Parse a comma-separated fields= parameter into a list of API_FIELDS.
+    id is always included and status brings status_class along.
+    Returns None (all fields) when the parameter is empty or has no valid names.
+    """
+    requested = {field.strip() for field in (fields_param or '').split(',')}
+    fields = [field for field in API_FIELDS if field in requested]
+    if not fields:
+        return None
+    
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    if 'status' in fields and 'status_class' not in fields:
+        fields.append('status_class')
+    return fields
+
+@functools.lru_cache(maxsize=256)
+def _row_plan(fields):
+    """Select columns and row positions for one fields tuple (cached per distinct tuple)"""
+    columns = [Veiculo.id]
+    plain = []
+    encoded = []
+    status_index = None
+    
+    for field in fields:
+        if field in DERIVED_FIELDS or field == 'id':
+            continue
+        if field in LOOKUP_COLUMNS:
+            # Select the integer id, decoded from the lookup cache in serialize()
+            encoded.append((len(columns), field))
+            columns.append(getattr(Veiculo, LOOKUP_COLUMNS[field][1]))
+        else:
+            plain.append((len(columns), field))
+            columns.append(getattr(Veiculo, field))
+        if field == 'status':
+            status_index = len(columns) - 1
+    
+    if 'status_class' in fields and status_index is None:
+        status_index = len(columns)
+        columns.append(Veiculo.status_id)
+    
+    return tuple(columns), tuple(plain), tuple(encoded), status_index
+
+def row_serializer(fields=None):
+    """
+    ORM-free serialization for read-only list queries.
+    Returns (columns, serialize): select the columns with Core and pass each
+    result row to serialize(), which builds the same dict as to_dict(fields).
+    """
+    fields = tuple(fields or API_FIELDS)
+    columns, plain, encoded, status_index = _row_plan(fields)
+    with_id = 'id' in fields
+    with_status_class = 'status_class' in fields
+    with_pessoa = 'pessoa_relacionada' in fields
+    lookup_cache.refresh()
+    decode = lookup_cache.value
+    
+    def serialize(row):
+        data = {field: row[index] or '' for index, field in plain}
+        for index, field in encoded:
+            data[field] = decode(field, row[index]) or ''
+        if with_id:
+            data['id'] = row[0]
+        if with_status_class:
+            status = decode('status', row[status_index])
+            data['status_class'] = status.lower().replace(' ', '_') if status else ''
+        if with_pessoa:
+            data['pessoa_relacionada'] = ''
+        return data
+    
+    return columns, serialize
+
+@db.event.listens_for(Veiculo, 'before_insert')
+@db.event.listens_for(Veiculo, 'before_update')
+def _sync_normalized_dates(mapper, connection, target):
+    """Recompute the normalized date columns from the raw TEXT dates"""
+    target.data_apreensao_dt = parse_date_field(target.data_apreensao)
+    target.ultima_movimentacao_dt = parse_date_field(target.ultima_movimentacao)
 
 class Ocorrencia(db.Model):
     __tablename__ = 'ocorrencia'
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Keyset (cursor) pagination for /api/vehicles
+Pages are addressed by the last seen (sort key, id) instead of OFFSET, and no COUNT(*) is run
+"""
+
+import base64
+import json
+
+from database import db, execute_read
+from models import Veiculo
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or belongs to another sort order"""
+
+def encode_cursor(sort_signature, key, vehicle_id, direction):
+    """Opaque, URL-safe cursor for the row at (key, vehicle_id)"""
+    payload = json.dumps(
+        {'s': sort_signature, 'k': key, 'i': vehicle_id, 'd': direction},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort_signature):
+    """Return (key, vehicle_id, direction) from a cursor made by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        key, vehicle_id, direction = payload['k'], int(payload['i']), payload['d']
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor(cursor)
+
+    if payload.get('s') != sort_signature or direction not in ('next', 'prev'):
+        raise InvalidCursor(cursor)
+
+    return key, vehicle_id, direction
+
+def _after(sort_column, descending, key, vehicle_id):
+    """
+    Rows strictly after (key, vehicle_id) in ORDER BY sort_column, id.
+    SQLite sorts NULLs first ascending and last descending.
+    """
+    if sort_column is Veiculo.id:
+        return Veiculo.id < vehicle_id if descending else Veiculo.id > vehicle_id
+
+    if descending:
+        if key is None:
+            return db.and_(sort_column.is_(None), Veiculo.id < vehicle_id)
+        return db.or_(
+            sort_column < key,
+            db.and_(sort_column == key, Veiculo.id < vehicle_id),
+            sort_column.is_(None)
+        )
+
+    if key is None:
+        return db.or_(
+            db.and_(sort_column.is_(None), Veiculo.id > vehicle_id),
+            sort_column.isnot(None)
+        )
+    return db.or_(
+        sort_column > key,
+        db.and_(sort_column == key, Veiculo.id > vehicle_id)
+    )
+
+def _ordering(sort_column, descending):
+    if sort_column is Veiculo.id:
+        return [Veiculo.id.desc() if descending else Veiculo.id.asc()]
+    if descending:
+        return [sort_column.desc(), Veiculo.id.desc()]
+    return [sort_column.asc(), Veiculo.id.asc()]
+
+def keyset_paginate(query, sort_column, descending, cursor, per_page, sort_signature):
+    """
+    Fetch one page of an (unordered) column query whose first column is Veiculo.id.
+    An empty cursor starts at the first page.
+    Returns (result rows, pagination info with next_cursor/prev_cursor).
+    """
+    per_page = max(per_page, 1)
+    direction = 'next'
+    has_prev = False
+
+    query = query.add_columns(sort_column.label('_sort_key'))
+
+    if cursor:
+        key, vehicle_id, direction = decode_cursor(cursor, sort_signature)
+        # Walking backwards means reading the reversed ordering and flipping the page
+        scan_descending = descending if direction == 'next' else not descending
+        query = query.filter(_after(sort_column, scan_descending, key, vehicle_id))
+    else:
+        scan_descending = descending
+
+    page_query = query.order_by(*_ordering(sort_column, scan_descending)).limit(per_page + 1)
+    rows = execute_read(page_query.statement).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == 'prev':
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    next_cursor = prev_cursor = None
+    if rows:
+        # The sort key was appended as the last column
+        if has_next:
+            next_cursor = encode_cursor(sort_signature, rows[-1][-1], rows[-1][0], 'next')
+        if has_prev:
+            prev_cursor = encode_cursor(sort_signature, rows[0][-1], rows[0][0], 'prev')
+
+    return [row[:-1] for row in rows], {
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'has_next': has_next,
+        'has_prev': has_prev
+    }
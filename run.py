@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """
 Run script for Vehicle Management System
-Starts the Flask development server
+Starts the Flask development server, or a multi-process WSGI server with --production
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -11,11 +12,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app import app
-from database import db
+from database import check_connection, reset_engines_after_fork
+from migrations import ensure_schema
 
 def check_database():
     """Check if database exists and has data"""
-    db_path = Path("veiculosapreendidos.db")
+    db_path = Path(app.config['DATABASE_PATH'])
     
     if not db_path.exists():
         print("⚠️  Database not found!")
@@ -25,6 +27,18 @@ def check_database():
     
     return True
 
+def prepare_database():
+    """
+    Create tables and apply migrations, only when the schema is behind.
+    create_app already did this unless AUTO_MIGRATE is off; running the
+    server from here always migrates.
+    """
+    app.config['SCHEMA_CURRENT'] = ensure_schema(app)
+    
+    with app.app_context():
+        if app.config['STARTUP_DIAGNOSTICS']:
+            check_connection(app)
+
 def run_app():
     """Run the Flask application"""
     print("🚓 Starting Vehicle Management System...")
@@ -33,9 +47,7 @@ def run_app():
     print("-" * 50)
     
     try:
-        # Create tables if they don't exist
-        with app.app_context():
-            db.create_all()
+        prepare_database()
         
         # Run the application
         app.run(
@@ -51,8 +63,102 @@ def run_app():
         print(f"\n❌ Error starting server: {e}")
         print("💡 Make sure the database is properly initialized")
 
-if __name__ == "__main__":
-    if check_database():
-        run_app()
+def server_options(args):
+    """Server settings from app.config, overridden by command line flags"""
+    config = app.config
+    return {
+        'bind': args.bind or config['SERVER_BIND'],
+        'workers': args.workers or config['SERVER_WORKERS'],
+        'threads': args.threads or config['SERVER_THREADS'],
+        'timeout': config['SERVER_TIMEOUT'],
+        'graceful_timeout': config['SERVER_GRACEFUL_TIMEOUT'],
+        'keepalive': config['SERVER_KEEPALIVE'],
+    }
+
+def run_gunicorn(options):
+    """Preforking gunicorn server: the app is loaded once, then forked into workers"""
+    from gunicorn.app.base import BaseApplication
+    
+    class VehicleServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', [options['bind']])
+            self.cfg.set('workers', options['workers'])
+            self.cfg.set('threads', options['threads'])
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', options['timeout'])
+            self.cfg.set('graceful_timeout', options['graceful_timeout'])
+            self.cfg.set('keepalive', options['keepalive'])
+            self.cfg.set('preload_app', True)
+            self.cfg.set('post_fork', lambda server, worker: reset_engines_after_fork(app))
+        
+        def load(self):
+            return app
+    
+    VehicleServer().run()
+
+def run_waitress(options):
+    """Single-process, multi-threaded waitress server (used where gunicorn is unavailable)"""
+    from waitress import serve
+    
+    if options['workers'] > 1:
+        print("⚠️  waitress runs a single process; using threads only")
+    serve(
+        app,
+        listen=options['bind'],
+        threads=options['workers'] * options['threads'],
+        channel_timeout=options['timeout'],
+    )
+
+def run_production(args):
+    """Run the application under a production WSGI server"""
+    options = server_options(args)
+    server = args.server
+    if server == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            server = 'gunicorn'
+        except ImportError:
+            server = 'waitress'
+    
+    print("🚓 Starting Vehicle Management System (production)...")
+    print(f"📍 Listening on {options['bind']} with {server}: "
+          f"{options['workers']} workers x {options['threads']} threads")
+    print("-" * 50)
+    
+    try:
+        prepare_database()
+        if server == 'gunicorn':
+            run_gunicorn(options)
+        else:
+            run_waitress(options)
+    except ImportError as e:
+        print(f"❌ {server} is not installed: {e}")
+        print("💡 Install it with: pip install gunicorn  (or: pip install waitress)")
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Vehicle Management System server')
+    parser.add_argument('--production', action='store_true',
+                        help='Serve with a multi-worker WSGI server instead of the dev server')
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'waitress'], default='auto',
+                        help='Production server (default: gunicorn if installed)')
+    parser.add_argument('--bind', help='Address to listen on, e.g. 0.0.0.0:8000 (SERVER_BIND)')
+    parser.add_argument('--workers', type=int, help='Worker processes (SERVER_WORKERS)')
+    parser.add_argument('--threads', type=int, help='Threads per worker (SERVER_THREADS)')
+    parser.add_argument('--diagnostics', action='store_true',
+                        help='Check the connection and count vehicles at startup (STARTUP_DIAGNOSTICS=1)')
+    args = parser.parse_args()
+    
+    if args.diagnostics:
+        app.config['STARTUP_DIAGNOSTICS'] = True
+    
+    if not check_database():
+        sys.exit(1)
+    
+    if args.production:
+        run_production(args)
     else:
-        sys.exit(1)
\ No newline at end of file
+        run_app()
+
+if __name__ == "__main__":
+    main()
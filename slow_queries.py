@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Slow-query log with EXPLAIN QUERY PLAN capture
+SELECTs slower than SLOW_QUERY_MS are appended to SLOW_QUERY_LOG (JSON lines)
+together with their query plan and flags for full scans and temp B-tree sorts.
+`python db_inspector.py --advise-indexes` turns the log into index proposals.
+"""
+
+from datetime import datetime
+import json
+import threading
+import time
+
+from flask import has_request_context, request
+
+from database import db
+
+_log_lock = threading.Lock()
+
+def analyze_plan(plan_rows):
+    """
+    Flags for EXPLAIN QUERY PLAN rows (id, parent, notused, detail):
+    'full_scan:<table>' for table scans without an index and
+    'temp_btree:<ORDER BY|GROUP BY|DISTINCT>' for sorts done in a temporary B-tree.
+    """
+    flags = []
+    for row in plan_rows:
+        detail = row[-1]
+        if detail.startswith('SCAN ') and 'INDEX' not in detail and 'VIRTUAL TABLE' not in detail:
+            flags.append(f"full_scan:{detail.split()[1]}")
+        elif detail.startswith('USE TEMP B-TREE FOR '):
+            flags.append(f"temp_btree:{detail[len('USE TEMP B-TREE FOR '):]}")
+    return flags
+
+def explain(dbapi_connection, statement, parameters):
+    """EXPLAIN QUERY PLAN rows for a statement, on a separate cursor of the same connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        return cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    finally:
+        cursor.close()
+
+class SlowQueryLog:
+    """Cursor-event listener that records statements over a latency threshold"""
+
+    def __init__(self, threshold_ms, path):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_started
+        if elapsed < self.threshold or executemany:
+            return
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return
+
+        try:
+            plan = explain(cursor.connection, statement, parameters)
+        except Exception as e:
+            plan = [(0, 0, 0, f'EXPLAIN failed: {e}')]
+        flags = analyze_plan(plan)
+
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'endpoint': request.endpoint if has_request_context() else None,
+            'duration_ms': round(elapsed * 1000, 3),
+            'sql': ' '.join(statement.split()),
+            'parameters': [value if isinstance(value, (str, int, float)) or value is None else str(value)
+                           for value in (parameters or ())],
+            'plan': [row[-1] for row in plan],
+            'flags': flags,
+        }
+        print(f"🐢 Slow query ({entry['duration_ms']:.1f} ms, {entry['endpoint']}): "
+              f"{', '.join(flags) or 'no scan/sort flags'}")
+
+        with _log_lock:
+            with open(self.path, 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+def init_slow_query_log(app):
+    """Attach the slow-query log to every engine when SLOW_QUERY_MS is configured"""
+    threshold_ms = app.config.get('SLOW_QUERY_MS')
+    if threshold_ms is None:
+        return None
+
+    log = SlowQueryLog(threshold_ms, app.config.get('SLOW_QUERY_LOG', 'slow_queries.jsonl'))
+    with app.app_context():
+        for engine in db.engines.values():
+            db.event.listen(engine, 'before_cursor_execute', log.before_cursor_execute)
+            db.event.listen(engine, 'after_cursor_execute', log.after_cursor_execute)
+    return log
+
+def read_log(path):
+    """Entries of a slow-query log file"""
+    with open(path, encoding='utf-8') as handle:
+        return [json.loads(line) for line in handle if line.strip()]
@@ -3,42 +3,66 @@
    ==================================================================== */
 
 window.API = {
+    /**
+     * Build the query string shared by the vehicle list and count endpoints
+     */
+    buildVehicleSearchParams(params = {}) {
+        const searchParams = new URLSearchParams();
+        
+        // Add search
+        if (params.search) {
+            searchParams.append('search', params.search);
+        }
+        
+        // Add filters, handling tipo specially for OR logic and dates
+        if (params.filters) {
+            Object.entries(params.filters).forEach(([key, value]) => {
+                if (key === 'tipo' && Array.isArray(value)) {
+                    // Send multiple tipo parameters for OR logic
+                    value.forEach(tipo => searchParams.append('tipo', tipo));
+                } else if (key === 'date_from' || key === 'date_to') {
+                    // Send date parameters
+                    if (value) {
+                        searchParams.append(key, value);
+                    }
+                } else if (value) {
+                    // Send other filters (only if they have a value)
+                    searchParams.append(key, value);
+                }
+            });
+        }
+        
+        return searchParams;
+    },
+
     /**
      * Fetch vehicles with filters and pagination
      */
     async fetchVehicles(params = {}) {
         try {
-            const searchParams = new URLSearchParams();
+            const searchParams = this.buildVehicleSearchParams(params);
             
             // Add pagination
             searchParams.append('page', params.page || 1);
             searchParams.append('per_page', params.perPage || window.PAGINATION_SETTINGS.defaultPerPage);
             
-            // Add search
-            if (params.search) {
-                searchParams.append('search', params.search);
+            // Total counting mode: exact (default), estimate or none
+            if (params.count) {
+                searchParams.append('count', params.count);
+            }
+            
+            // Only fetch the columns that will be displayed
+            if (params.fields && params.fields.length) {
+                searchParams.append('fields', params.fields.join(','));
             }
             
             // Add sorting
             searchParams.append('sort_by', params.sortBy || 'data_apreensao');
             searchParams.append('sort_order', params.sortOrder || 'desc');
             
-            // Add filters, handling tipo specially for OR logic and dates
-            if (params.filters) {
-                Object.entries(params.filters).forEach(([key, value]) => {
-                    if (key === 'tipo' && Array.isArray(value)) {
-                        // Send multiple tipo parameters for OR logic
-                        value.forEach(tipo => searchParams.append('tipo', tipo));
-                    } else if (key === 'date_from' || key === 'date_to') {
-                        // Send date parameters
-                        if (value) {
-                            searchParams.append(key, value);
-                        }
-                    } else if (value) {
-                        // Send other filters (only if they have a value)
-                        searchParams.append(key, value);
-                    }
-                });
+            // Full records of the page for the details view
+            if (params.prefetch) {
+                searchParams.append('prefetch', '1');
             }
             
             const response = await fetch(`${window.API_ENDPOINTS.vehicles}?${searchParams}`);
@@ -54,6 +78,44 @@ window.API = {
         }
     },
 
+    /**
+     * Fetch the exact total for the current filters
+     */
+    async fetchVehicleCount(params = {}) {
+        try {
+            const searchParams = this.buildVehicleSearchParams(params);
+            const response = await fetch(`${window.API_ENDPOINTS.vehicleCount}?${searchParams}`);
+            
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            
+            return await response.json();
+        } catch (error) {
+            console.error('Error fetching vehicle count:', error);
+            throw error;
+        }
+    },
+
+    /**
+     * Fetch per-option filter counts for the current filters
+     */
+    async fetchVehicleFacets(params = {}) {
+        try {
+            const searchParams = this.buildVehicleSearchParams(params);
+            const response = await fetch(`${window.API_ENDPOINTS.vehicleFacets}?${searchParams}`);
+            
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            
+            return await response.json();
+        } catch (error) {
+            console.error('Error fetching vehicle facets:', error);
+            throw error;
+        }
+    },
+
     /**
      * Fetch vehicle details by ID
      */
@@ -72,6 +134,28 @@ window.API = {
         }
     },
 
+    /**
+     * Fetch the full records of many vehicles in one request
+     */
+    async fetchVehicleBatch(vehicleIds) {
+        try {
+            const response = await fetch(window.API_ENDPOINTS.vehicleBatch, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ ids: vehicleIds })
+            });
+            
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            
+            return await response.json();
+        } catch (error) {
+            console.error('Error fetching vehicle batch:', error);
+            throw error;
+        }
+    },
+
     /**
      * Fetch autocomplete suggestions
      */
@@ -45,7 +45,10 @@ window.DEFAULT_VISIBLE_COLUMNS = [
 // API endpoints
 window.API_ENDPOINTS = {
     vehicles: '/api/vehicles',
+    vehicleCount: '/api/vehicles/count',
+    vehicleFacets: '/api/vehicles/facets',
     vehicleDetails: '/api/vehicle',
+    vehicleBatch: '/api/vehicles/batch',
     autocomplete: '/api/search/autocomplete',
     filterOptions: '/api/filters/options',
     statistics: '/api/statistics',
@@ -3,6 +3,11 @@
    ==================================================================== */
 
 window.Details = {
+    // Full records of the current page, by id (filled by prefetch or batch)
+    records: new Map(),
+    // In-flight batch request for the current page, shared by hover and click
+    pending: null,
+
     /**
      * Initialize details functionality
      */
@@ -10,12 +15,74 @@ window.Details = {
         console.log('Details module initialized');
     },
 
+    /**
+     * Replace the cached records with the details prefetched for a new page
+     */
+    setPrefetched(details) {
+        this.records = new Map(
+            Object.entries(details || {}).map(([id, vehicle]) => [Number(id), vehicle])
+        );
+        this.pending = null;
+    },
+
+    /**
+     * Load the full records of every row of the page that is not cached yet,
+     * in one batch request (started on the first hover or row click)
+     */
+    prefetchPage() {
+        if (this.pending) return this.pending;
+        
+        const records = this.records;
+        const missing = (window.AppState.vehicles || [])
+            .map(vehicle => vehicle.id)
+            .filter(id => !records.has(id));
+        if (!missing.length) return Promise.resolve();
+        
+        const request = API.fetchVehicleBatch(missing)
+            .then(({ vehicles }) => {
+                // Stored in this page's map, so a late answer can't leak into the next page
+                vehicles.forEach(vehicle => records.set(vehicle.id, vehicle));
+            })
+            .finally(() => {
+                if (this.pending === request) this.pending = null;
+            });
+        this.pending = request;
+        return request;
+    },
+
+    /**
+     * Full record of a vehicle: from the page cache, else through the page's
+     * batch request
+     */
+    async getVehicle(vehicleId) {
+        vehicleId = Number(vehicleId);
+        if (this.records.has(vehicleId)) {
+            return this.records.get(vehicleId);
+        }
+        
+        const pageIds = (window.AppState.vehicles || []).map(vehicle => vehicle.id);
+        if (!pageIds.includes(vehicleId)) {
+            return API.fetchVehicleDetails(vehicleId);
+        }
+        
+        await this.prefetchPage();
+        if (!this.records.has(vehicleId)) {
+            // The batch in flight was for an earlier selection of missing rows
+            await this.prefetchPage();
+        }
+        
+        if (!this.records.has(vehicleId)) {
+            throw new Error(`Vehicle ${vehicleId} not found`);
+        }
+        return this.records.get(vehicleId);
+    },
+
     /**
      * Show vehicle details
      */
     async showVehicle(vehicleId) {
         try {
-            const vehicle = await API.fetchVehicleDetails(vehicleId);
+            const vehicle = await this.getVehicle(vehicleId);
             this.renderVehicleDetails(vehicle);
             
             // Auto-expand details card and collapse results
@@ -8,6 +8,9 @@ window.Filters = {
     
     // Track which date shortcut is active
     activeDateShortcut: null,
+    
+    // Incremented per facet fetch so stale counts are ignored
+    facetRequestCounter: 0,
 
     /**
      * Initialize filter components
@@ -68,6 +71,45 @@ window.Filters = {
         }
     },
 
+    /**
+     * Show how many vehicles each option would return with the other filters
+     */
+    async refreshFacetCounts(params) {
+        const requestId = ++this.facetRequestCounter;
+        
+        try {
+            const { facets } = await API.fetchVehicleFacets(params);
+            if (requestId !== this.facetRequestCounter) return;
+            
+            const selects = {
+                status: 'statusFilter',
+                patio: 'patioFilter',
+                circunscricao: 'circunscricaoFilter'
+            };
+            
+            Object.entries(selects).forEach(([facet, elementId]) => {
+                const select = document.getElementById(elementId);
+                if (!select || !facets[facet]) return;
+                
+                facets[facet].forEach(({ value, count }) => {
+                    const option = Array.from(select.options).find(opt => opt.value === value);
+                    if (option) {
+                        option.textContent = `${value} (${count.toLocaleString('pt-BR')})`;
+                    }
+                });
+            });
+            
+            (facets.tipo || []).forEach(({ value, count }) => {
+                const label = document.querySelector(`#tipoFilter label[for="tipo_${value}"]`);
+                if (label) {
+                    label.textContent = `${value} (${count.toLocaleString('pt-BR')})`;
+                }
+            });
+        } catch (error) {
+            console.error('Error refreshing facet counts:', error);
+        }
+    },
+
     /**
      * Setup filter event listeners
      */
@@ -3,6 +3,12 @@
    ==================================================================== */
 
 window.Table = {
+    // Incremented per fetch so stale responses are ignored
+    requestCounter: 0,
+    
+    // Fields present in the loaded rows (null = full records)
+    loadedFields: null,
+
     /**
      * Initialize table functionality
      */
@@ -24,25 +30,82 @@ window.Table = {
                 search: window.AppState.searchQuery,
                 filters: window.AppState.filters,
                 sortBy: window.AppState.sortBy,
-                sortOrder: window.AppState.sortOrder
+                sortOrder: window.AppState.sortOrder,
+                // Render right away; the exact total is filled in afterwards
+                count: 'estimate',
+                fields: this.getVisibleColumnKeys()
             };
             
+            const requestId = ++this.requestCounter;
             const data = await API.fetchVehicles(params);
             
+            // A newer request was issued while this one was in flight
+            if (requestId !== this.requestCounter) return;
+            
             window.AppState.vehicles = data.vehicles;
             window.AppState.pagination = data.pagination;
+            this.loadedFields = new Set(params.fields);
+            
+            // New page: drop the previous page's records (batch-loaded on first hover/click)
+            if (window.Details && window.Details.setPrefetched) {
+                window.Details.setPrefetched(data.details);
+            }
             
             this.renderTable();
             this.renderPagination();
             
             UI.hideLoading();
             
+            if (data.pagination.total_exact === false) {
+                this.refreshTotal(params, requestId);
+            }
+            
+            if (window.Filters && window.Filters.refreshFacetCounts) {
+                window.Filters.refreshFacetCounts(params);
+            }
+            
         } catch (error) {
             console.error('Error fetching vehicles:', error);
             UI.showError('Erro ao carregar veículos. Verifique a conexão.');
         }
     },
 
+    /**
+     * Replace an estimated total with the exact count and re-render pagination
+     */
+    async refreshTotal(params, requestId) {
+        try {
+            const { total } = await API.fetchVehicleCount(params);
+            if (requestId !== this.requestCounter) return;
+            
+            const pagination = window.AppState.pagination;
+            pagination.total = total;
+            pagination.total_exact = true;
+            pagination.pages = total ? Math.ceil(total / pagination.per_page) : 0;
+            pagination.has_next = pagination.page < pagination.pages;
+            
+            this.renderPagination();
+        } catch (error) {
+            console.error('Error refreshing total:', error);
+        }
+    },
+
+    /**
+     * Visible columns as [key, title] pairs, from the column manager settings
+     */
+    getVisibleColumns() {
+        return window.ColumnManager ? 
+            window.ColumnManager.getVisibleColumns() : 
+            window.DEFAULT_VISIBLE_COLUMNS.map(k => [k, window.COLUMN_CONFIG[k]]);
+    },
+
+    /**
+     * Keys of the visible columns, sent to the API as fields=
+     */
+    getVisibleColumnKeys() {
+        return this.getVisibleColumns().map(([key]) => key);
+    },
+
     /**
      * Render table with current data and column visibility
      */
@@ -54,9 +117,13 @@ window.Table = {
         if (!thead || !tbody || !table) return;
         
         // Get visible columns based on column manager settings
-        const visibleColumns = window.ColumnManager ? 
-            window.ColumnManager.getVisibleColumns() : 
-            window.DEFAULT_VISIBLE_COLUMNS.map(k => [k, window.COLUMN_CONFIG[k]]);
+        const visibleColumns = this.getVisibleColumns();
+        
+        // A newly shown column was not fetched with the current rows
+        if (this.loadedFields && visibleColumns.some(([key]) => !this.loadedFields.has(key))) {
+            this.fetchAndRender();
+            return;
+        }
         
         const columnCount = visibleColumns.length;
         
@@ -76,6 +143,13 @@ window.Table = {
             </th>`
         ).join('');
         
+        // Pointing at the results loads the page's full records, ready for a click
+        tbody.onmouseenter = () => {
+            if (window.Details && window.Details.prefetchPage) {
+                window.Details.prefetchPage().catch(error => console.warn('Details prefetch failed:', error));
+            }
+        };
+        
         // Render body
         tbody.innerHTML = window.AppState.vehicles.map(vehicle => 
             `<tr onclick="Details.showVehicle(${vehicle.id})">
@@ -113,12 +187,13 @@ window.Table = {
         const pagination = document.getElementById('pagination');
         if (!pagination) return;
         
-        const { page, pages, total, per_page, has_prev, has_next } = window.AppState.pagination;
+        const { page, pages, total, total_exact, per_page, has_prev, has_next } = window.AppState.pagination;
+        const totalLabel = total_exact === false ? `${total}+` : total;
         
         pagination.innerHTML = `
             <div class="pagination-left">
                 <div class="pagination-info">
-                    Mostrando ${((page - 1) * per_page) + 1}-${Math.min(page * per_page, total)} de ${total} resultados
+                    Mostrando ${((page - 1) * per_page) + 1}-${Math.min(page * per_page, total)} de ${totalLabel} resultados
                 </div>
                 <div class="results-per-page">
                     <label for="resultsPerPage">Resultados por página:</label>
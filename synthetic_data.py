@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic veiculos database for benchmarks
+Values follow the distributions of the real data: status/tipo/pátio/circunscrição
+shares including their "Outros" tails, mixed TEXT date formats and sparse columns.
+The output has the legacy schema, so the app's own migrations upgrade it.
+
+    python synthetic_data.py --rows 1000000 --output bench_data/synthetic.db
+"""
+
+import argparse
+import bisect
+import random
+import sqlite3
+import string
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from importer import importable_columns
+from lookups import LEGACY_COLUMNS
+
+GENERATOR_VERSION = 1
+INSERT_BATCH_SIZE = 10000
+
+# Dates are spread over the two years before this day, never relative to "now"
+REFERENCE_DATE = datetime(2025, 6, 30)
+EPOCH = datetime(1970, 1, 1)
+
+# (value, weight) pairs measured on veiculosapreendidos.db
+STATUS = [('Apreendido', 57), ('Entregue', 42), ('Depositado', 1)]
+TIPO = [('CARRO', 50), ('MOTO', 48), ('CAMINHONETE', 1), ('CAMINHÃO', 0.5), ('ÔNIBUS', 0.2)]
+PATIO = [('-', 43), ('JDN - Atibaia', 33), ('16º DP', 20), ('35º DP', 2), ('17º DP', 1.4),
+         ('97º DP', 0.3), ('27º DP', 0.2), ('Pátio Guarulhos', 0.1)]
+CIRCUNSCRICAO = [('35º DP', 41), ('16º DP', 36), ('17º DP', 17), (None, 2), ('27º DP', 1.4),
+                 ('97º DP', 0.7), ('95º DP', 0.7), ('11º DP', 0.7), ('DEL. POL GUARUJÁ', 0.5)]
+COR = [(None, 65), ('PRETA', 7), ('BRANCO', 6), ('PRATA', 5), ('CINZA', 4), ('AZUL', 4),
+       ('VERMELHO', 4), ('Preta', 1.5), ('Prata', 1.5), ('Branco', 1), ('PRETO', 1)]
+EQUIPE = [('-', 54), ('Plantão', 32), ('EPJ 5', 3), (None, 3), ('EPJ 4', 2), ('35º DP', 2),
+          ('17º DP', 2), ('EPJ 2', 1), ('EPJ 1', 1), ('Chefia', 1)]
+PROCEDIMENTO = [('-', 40), ('Flagrante', 20), ('Ato Infracional', 15), ('Termo Circunstanciado', 10),
+                ('Inquérito Policial', 10), ('Boletim de Ocorrência', 3), (None, 2)]
+CHAVE = [('COM', 62), ('SEM', 25), (None, 12), ('***', 1)]
+PERICIA = [('Veicular', 42), ('Não Solicitada', 40), ('Metalográfico', 18)]
+STATUS_PERICIA = [('-', 41), ('Realizada', 40), ('Pendente', 18), (None, 1)]
+STATUS_LAUDO = [('-', 40), ('Não Disponível', 29), ('Disponível', 28), (None, 3)]
+NATUREZA = [(None, 98), ('CP - Art. 311 - Adulteração de  sinal identificador', 1), ('CP - Art. 157 - Roubo', 1)]
+
+MODELOS = {
+    'CARRO': ['CHEV ONIX', 'VW/GOL 1.0', 'FIAT/UNO MILLE', 'RENAULT CLIO EXP GNV S', 'JEEP/RENEGADE SPORT AT',
+              'HYUNDAI/HB20 1.0M', 'FORD/KA SE 1.0', 'TOYOTA/COROLLA XEI', 'FIAT/PALIO FIRE', 'VW/FOX 1.6'],
+    'MOTO': ['HONDA/CG 160 TITAN', 'HONDA/ELITE 125', 'HONDA/CG 125 FAN_x000D_', 'YAMAHA/FACTOR YBR125',
+             'HONDA/BIZ 125', 'YAMAHA/FAZER YS250', 'HONDA/POP 110I', 'SUZUKI/YES 125'],
+    'CAMINHONETE': ['FIAT/STRADA WORKING', 'VW/SAVEIRO CS', 'TOYOTA/HILUX CD'],
+}
+
+OBSERVACOES = [
+    'Entregue em {day}', 'Removido em {day}', 'Encaminhado para o {dp}',
+    'Ocorrência da chefia; inquérito instaurado no {dp}', 'AFIS solicitado (MSG {number}/25)',
+    'Veículo desmanchado; modelo e placa prováveis', '{number}/2025',
+]
+
+# How each raw date is written: mostly ISO, but every format parse_date_field accepts appears
+DATE_FORMATS = [
+    ('iso', 55), ('br', 15), ('timestamp', 10), ('timestamp_float', 8), ('br_dash', 3),
+    ('iso_slash', 2), ('iso_time', 3), ('br_time', 2), ('timestamp_ms', 1), ('year', 0.5), ('invalid', 0.5),
+]
+
+class Picker:
+    """Weighted choice with precomputed cumulative weights"""
+
+    def __init__(self, rng, weighted):
+        self.rng = rng
+        self.values = [value for value, _ in weighted]
+        self.cumulative = []
+        total = 0
+        for _, weight in weighted:
+            total += weight
+            self.cumulative.append(total)
+        self.total = total
+
+    def __call__(self):
+        return self.values[bisect.bisect(self.cumulative, self.rng.random() * self.total)]
+
+def format_date(rng, moment, style):
+    # Epoch seconds are computed without the local timezone so every machine writes the same file
+    seconds = int((moment - EPOCH).total_seconds())
+    if style == 'iso':
+        return moment.strftime('%Y-%m-%d')
+    if style == 'br':
+        return moment.strftime('%d/%m/%Y')
+    if style == 'br_dash':
+        return moment.strftime('%d-%m-%Y')
+    if style == 'iso_slash':
+        return moment.strftime('%Y/%m/%d')
+    if style == 'iso_time':
+        return moment.strftime('%Y-%m-%d %H:%M:%S')
+    if style == 'br_time':
+        return moment.strftime('%d/%m/%Y %H:%M:%S')
+    if style == 'timestamp':
+        return str(seconds)
+    if style == 'timestamp_float':
+        return f'{seconds}.0'
+    if style == 'timestamp_ms':
+        return str(seconds * 1000)
+    if style == 'year':
+        return str(moment.year)
+    return rng.choice(['sem data', '??/??/2025', '-'])
+
+def plate(rng):
+    letters = ''.join(rng.choices(string.ascii_uppercase, k=3))
+    if rng.random() < 0.6:  # Mercosul ABC1D23
+        return f'{letters}{rng.randint(0, 9)}{rng.choice(string.ascii_uppercase)}{rng.randint(0, 99):02d}'
+    return f'{letters}{rng.randint(0, 9999):04d}'
+
+def chassi(rng):
+    return '9' + ''.join(rng.choices('ABCDEFGHJKLMNPRSTUVWXYZ0123456789', k=16))
+
+class VehicleGenerator:
+    """Produces one {column: value} record per call, reproducibly for a given seed"""
+
+    def __init__(self, seed=42):
+        rng = self.rng = random.Random(seed)
+        self.status = Picker(rng, STATUS)
+        self.tipo = Picker(rng, TIPO)
+        self.patio = Picker(rng, PATIO)
+        self.circunscricao = Picker(rng, CIRCUNSCRICAO)
+        self.cor = Picker(rng, COR)
+        self.equipe = Picker(rng, EQUIPE)
+        self.procedimento = Picker(rng, PROCEDIMENTO)
+        self.chave = Picker(rng, CHAVE)
+        self.pericia = Picker(rng, PERICIA)
+        self.status_pericia = Picker(rng, STATUS_PERICIA)
+        self.status_laudo = Picker(rng, STATUS_LAUDO)
+        self.natureza = Picker(rng, NATUREZA)
+        self.date_format = Picker(rng, DATE_FORMATS)
+        self.spj_counter = 0
+
+    def spj(self):
+        # Unique codes in the real shape (two letters + four digits), then a numeric suffix
+        self.spj_counter += 1
+        number = self.spj_counter
+        letters = string.ascii_uppercase[number // 260000 % 26] + string.ascii_uppercase[number // 10000 % 26]
+        suffix = f'-{number // 6760000}' if number >= 6760000 else ''
+        return f'{letters}{number % 10000:04d}{suffix}'
+
+    def date(self, seized):
+        return format_date(self.rng, seized, self.date_format())
+
+    def observation(self, seized):
+        template = self.rng.choice(OBSERVACOES)
+        return template.format(
+            day=(seized + timedelta(days=self.rng.randint(1, 90))).strftime('%d/%m/%Y'),
+            dp=self.rng.choice(['16º DP', '17º DP', '35º DP', '27º DP']),
+            number=self.rng.randint(100, 9999),
+        )
+
+    def __call__(self):
+        rng = self.rng
+        seized = REFERENCE_DATE - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86399))
+        moved = seized + timedelta(days=rng.randint(0, 120))
+        tipo = self.tipo()
+        ano = rng.randint(2000, 2024)
+
+        return {
+            'spj': self.spj(),
+            'anospj': str(seized.year),
+            'circunscrição': self.circunscricao(),
+            'natureza': self.natureza(),
+            'procedimento': self.procedimento(),
+            'equipe': self.equipe(),
+            'procedimentonumero': (f'{rng.randint(2000000, 2399999)}-{rng.randint(0, 99):02d}.'
+                                   f'{seized.year}.010216') if rng.random() < 0.42 else None,
+            'status': self.status(),
+            'pátio': self.patio(),
+            'chave': self.chave(),
+            'dataapreensão': self.date(seized) if rng.random() < 0.85 else None,
+            'datamovimentação': self.date(moved) if rng.random() < 0.6 else None,
+            'tipo': tipo,
+            'modelo': rng.choice(MODELOS.get(tipo, MODELOS['CAMINHONETE'])) if rng.random() < 0.99 else None,
+            'cor': self.cor(),
+            'anofabricação': (f'{ano}.0' if rng.random() < 0.5 else str(ano)) if rng.random() < 0.3 else None,
+            'anomodelo': str(ano + rng.randint(0, 1)) if rng.random() < 0.05 else None,
+            'placaverdadeira': plate(rng) if rng.random() < 0.86 else None,
+            'placaostentada': plate(rng) if rng.random() < 0.65 else None,
+            'chassi': chassi(rng) if rng.random() < 0.03 else None,
+            'perícia': self.pericia(),
+            'períciaprotocolo': f'{rng.randint(1000, 49999)}.0' if rng.random() < 0.5 else None,
+            'statusperícia': self.status_pericia(),
+            'laudo': f'{rng.randint(1000, 499999)}.0' if rng.random() < 0.57 else None,
+            'statuslaudo': self.status_laudo(),
+            'afis': str(rng.randint(1000, 9999)) if rng.random() < 0.01 else None,
+            'proprietário': None,
+            'obs1': self.observation(seized) if rng.random() < 0.82 else None,
+            'obs2': self.observation(seized) if rng.random() < 0.27 else None,
+        }
+
+def legacy_columns():
+    """The TEXT columns of the original veiculos table (no normalized/computed columns)"""
+    return [LEGACY_COLUMNS.get(column, column) for column in dict.fromkeys(importable_columns().values())]
+
+def generate_database(output, rows, seed=42):
+    """Write a fresh legacy-schema database with `rows` synthetic vehicles"""
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.exists():
+        output.unlink()
+
+    columns = legacy_columns()
+    quoted = ', '.join(f'"{column}"' for column in columns)
+    generate = VehicleGenerator(seed)
+    started = time.perf_counter()
+
+    connection = sqlite3.connect(output, isolation_level=None)
+    try:
+        # Throwaway file: no journal, no fsync
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(
+            f'CREATE TABLE veiculos ("id" INTEGER PRIMARY KEY AUTOINCREMENT, '
+            f'{", ".join(f"{chr(34)}{column}{chr(34)} TEXT" for column in columns)})'
+        )
+        connection.execute("BEGIN")
+        insert = f'INSERT INTO veiculos ({quoted}) VALUES ({", ".join("?" for _ in columns)})'
+        for start in range(0, rows, INSERT_BATCH_SIZE):
+            count = min(INSERT_BATCH_SIZE, rows - start)
+            batch = []
+            for _ in range(count):
+                record = generate()
+                batch.append([record[column] for column in columns])
+            connection.executemany(insert, batch)
+            done = start + count
+            if done % 100000 == 0 or done == rows:
+                print(f"  {done:,} rows ({done / (time.perf_counter() - started):,.0f} rows/s)")
+        connection.execute("COMMIT")
+        connection.execute("PRAGMA user_version = 0")
+    finally:
+        connection.close()
+
+    print(f"✅ Generated {rows:,} vehicles in {time.perf_counter() - started:.1f}s: {output}")
+    return output
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic veiculos database')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of vehicles')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+    parser.add_argument('--output', default=None, help='Database file to write')
+    args = parser.parse_args()
+
+    output = args.output or f'bench_data/synthetic-{args.rows}-s{args.seed}.db'
+    generate_database(output, args.rows, args.seed)
+    print("💡 Run the migrations (python run.py / benchmark.py) before using it")
+
+if __name__ == "__main__":
+    main()